@@ -1,5 +1,6 @@
 from django.contrib import admin
 from import_export.admin import ImportExportModelAdmin
+from .counters import live_view_count
 from .models import Category, Expense, Budget, Goal, Article, UserProfile
 
 
@@ -35,10 +36,15 @@ class GoalAdmin(admin.ModelAdmin):
 
 @admin.register(Article)
 class ArticleAdmin(admin.ModelAdmin):
-    list_display = ['title', 'category', 'author', 'is_featured', 'view_count', 'created_at']
+    list_display = ['title', 'category', 'author', 'is_featured', 'live_views', 'created_at']
     list_filter = ['category', 'is_featured', 'created_at']
     search_fields = ['title', 'content', 'summary', 'author']
-    readonly_fields = ['view_count', 'created_at', 'updated_at']
+    readonly_fields = ['view_count', 'live_views', 'created_at', 'updated_at']
+
+    @admin.display(description='Views (live)', ordering='view_count')
+    def live_views(self, obj):
+        """Stored count plus views still buffered in the cache (approximate)"""
+        return live_view_count(obj)
 
 
 @admin.register(UserProfile)
@@ -0,0 +1,72 @@
+"""
+Version stamps and helpers for cache keys
+"""
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+
+
+def get_data_version(user):
+    """Current data version for a user (a counter on their profile)"""
+    try:
+        return user.profile.data_version
+    except ObjectDoesNotExist:
+        # bump_data_version() creates the profile at version 1
+        return 0
+
+
+def filter_fingerprint(params):
+    """Stable short hash of a dict of filter parameters"""
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def user_cache_key(user, name, *parts):
+    """Cache key for a per-user figure, versioned by the user's data and the categories"""
+    suffix = ':'.join(str(part) for part in parts)
+    return f'finance_app:{name}:{user.pk}:{get_data_version(user)}:{get_category_version()}:{suffix}'
+
+
+def get_or_revalidate(key, version, compute, timeout, lock_timeout=30):
+    """(value, current) of compute() for ``version``; stale while one caller recomputes"""
+    entry = cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1], True
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, lock_timeout):
+        if entry is not None:
+            return entry[1], False
+        return compute(), True
+    try:
+        value = compute()
+        cache.set(key, (version, value), timeout)
+        return value, True
+    finally:
+        cache.delete(lock_key)
+
+
+CATEGORY_VERSION_KEY = 'finance_app:category_version'
+
+
+def get_category_version():
+    """Current version stamp of the global Category table"""
+    version = cache.get(CATEGORY_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(CATEGORY_VERSION_KEY, version, timeout=None):
+            version = cache.get(CATEGORY_VERSION_KEY, version)
+    return version
+
+
+def bump_category_version():
+    """Invalidate every process's in-memory category cache"""
+    try:
+        return cache.incr(CATEGORY_VERSION_KEY)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(CATEGORY_VERSION_KEY, version, timeout=None)
+        return version
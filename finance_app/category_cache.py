@@ -0,0 +1,66 @@
+"""
+Process-local cache of the Category table
+
+Categories are a small global table read on almost every page. Each process
+keeps them in memory, tagged with the shared category version stamp;
+saving or deleting a Category bumps the stamp, and every process reloads on
+its next lookup. With a per-process cache backend (no REDIS_URL) other
+workers can't see the bump, so entries are also reloaded after
+CATEGORY_CACHE_MAX_AGE seconds.
+"""
+import threading
+import time
+
+from .cache_utils import get_category_version
+from .models import Category
+
+CATEGORY_CACHE_MAX_AGE = 300
+
+_lock = threading.Lock()
+_state = {
+    'version': None,
+    'loaded_at': 0.0,
+    'categories': [],
+    'by_id': {},
+}
+
+
+def _load():
+    version = get_category_version()
+    if _state['version'] == version and time.monotonic() - _state['loaded_at'] < CATEGORY_CACHE_MAX_AGE:
+        return _state
+    with _lock:
+        if _state['version'] != version or time.monotonic() - _state['loaded_at'] >= CATEGORY_CACHE_MAX_AGE:
+            categories = list(Category.objects.order_by('name'))
+            _state.update(
+                version=version,
+                loaded_at=time.monotonic(),
+                categories=categories,
+                by_id={category.pk: category for category in categories},
+            )
+    return _state
+
+
+def get_categories():
+    """All categories ordered by name"""
+    return _load()['categories']
+
+
+def get_category(pk):
+    """Category by id, or None"""
+    return _load()['by_id'].get(pk)
+
+
+def get_category_names():
+    """Map of category id to name"""
+    return {pk: category.name for pk, category in _load()['by_id'].items()}
+
+
+def attach_categories(expenses):
+    """Set expense.category from the cache so templates don't query per row"""
+    by_id = _load()['by_id']
+    for expense in expenses:
+        category = by_id.get(expense.category_id)
+        if category is not None:
+            expense.category = category
+    return expenses
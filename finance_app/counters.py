@@ -0,0 +1,206 @@
+"""
+Buffered article view counters
+"""
+import atexit
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+from django.db.models import F
+
+from .models import Article
+
+VIEW_BUFFER_HITS = 50
+VIEW_BUFFER_SECONDS = 5
+VIEW_FLUSH_THRESHOLD = 500
+VIEW_FLUSH_SECONDS = 60
+PENDING_VIEWS_TIMEOUT = 60 * 60 * 24 * 7
+
+_lock = threading.Lock()
+_buffer = Counter()
+_buffered_hits = 0
+# Articles this process has pushed to the cache since its last flush
+_dirty_ids = set()
+_last_push = time.monotonic()
+_last_flush = time.monotonic()
+# Process that started the flush thread (threads don't survive a fork)
+_flush_thread_pid = None
+
+
+def _pending_key(article_id):
+    return f'finance_app:article_views:{article_id}'
+
+
+def record_article_view(article_id):
+    """Count one view of an article"""
+    global _buffered_hits
+    _start_flush_thread()
+    with _lock:
+        _buffer[article_id] += 1
+        _buffered_hits += 1
+        due = (
+            _buffered_hits >= VIEW_BUFFER_HITS
+            or time.monotonic() - _last_push >= VIEW_BUFFER_SECONDS
+        )
+    if due:
+        push_buffered_views()
+
+
+def pending_views(article_id):
+    """Views of an article not yet written to the database"""
+    with _lock:
+        local = _buffer.get(article_id, 0)
+    return (cache.get(_pending_key(article_id)) or 0) + local
+
+
+def live_view_count(article):
+    """Approximate current view count: stored count plus pending views"""
+    return article.view_count + pending_views(article.pk)
+
+
+def push_buffered_views():
+    """Move this process's buffered views into the shared cache"""
+    global _buffered_hits, _last_push
+    with _lock:
+        counts = dict(_buffer)
+        _buffer.clear()
+        _buffered_hits = 0
+        _last_push = time.monotonic()
+    if not counts:
+        return
+
+    over_threshold = []
+    for article_id, views in counts.items():
+        key = _pending_key(article_id)
+        if cache.add(key, views, timeout=PENDING_VIEWS_TIMEOUT):
+            total = views
+        else:
+            try:
+                total = cache.incr(key, views)
+            except ValueError:
+                # Expired between add() and incr()
+                cache.set(key, views, timeout=PENDING_VIEWS_TIMEOUT)
+                total = views
+        if total >= VIEW_FLUSH_THRESHOLD:
+            over_threshold.append(article_id)
+
+    with _lock:
+        _dirty_ids.update(counts)
+        timer_due = time.monotonic() - _last_flush >= VIEW_FLUSH_SECONDS
+    if timer_due:
+        flush_view_counts()
+    elif over_threshold:
+        flush_view_counts(over_threshold)
+
+
+def flush_view_counts(article_ids=None):
+    """Write pending view counts for the given articles (default: all pushed ones) to the database"""
+    global _last_flush
+    with _lock:
+        if article_ids is None:
+            article_ids = list(_dirty_ids)
+            _dirty_ids.clear()
+            _last_flush = time.monotonic()
+        else:
+            _dirty_ids.difference_update(article_ids)
+    try:
+        return apply_pending_views(article_ids)
+    except DatabaseError:
+        # Unwritten counts went back to the cache; keep them due for the next flush
+        with _lock:
+            _dirty_ids.update(article_ids)
+        raise
+
+
+def apply_pending_views(article_ids):
+    """Move cached pending views for the given articles into view_count"""
+    keys = {_pending_key(article_id): article_id for article_id in article_ids}
+    if not keys:
+        return 0
+
+    # Claim each count with decr() before writing so two processes flushing
+    # the same article can't both apply it; views that arrive meanwhile stay
+    # in the cache for the next flush
+    claimed = defaultdict(list)
+    for key, views in cache.get_many(list(keys)).items():
+        if not views or views <= 0:
+            continue
+        try:
+            remaining = cache.decr(key, views)
+        except ValueError:
+            continue
+        if remaining < 0:
+            cache.incr(key, views)
+            continue
+        claimed[views].append(keys[key])
+
+    written = 0
+    for views, ids in claimed.items():
+        try:
+            Article.objects.filter(pk__in=ids).update(view_count=F('view_count') + views)
+        except DatabaseError:
+            for article_id in ids:
+                cache.incr(_pending_key(article_id), views)
+            raise
+        written += views * len(ids)
+    return written
+
+
+def sweep_view_counts(chunk_size=1000):
+    """Flush cached pending views for every article, whichever process left them"""
+    push_buffered_views()
+    written = flush_view_counts()
+    chunk = []
+    for article_id in Article.objects.order_by().values_list('pk', flat=True).iterator(chunk_size=chunk_size):
+        chunk.append(article_id)
+        if len(chunk) == chunk_size:
+            written += apply_pending_views(chunk)
+            chunk = []
+    return written + apply_pending_views(chunk)
+
+
+def flush_due_views():
+    """Push and flush whatever the buffer and flush timers say is due"""
+    push_buffered_views()
+    with _lock:
+        due = bool(_dirty_ids) and time.monotonic() - _last_flush >= VIEW_FLUSH_SECONDS
+    if due:
+        flush_view_counts()
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(VIEW_BUFFER_SECONDS)
+        try:
+            flush_due_views()
+        except Exception:
+            # Unwritten views stay in the buffer or the cache for the next tick
+            pass
+        finally:
+            # This thread's own connection; don't hold it between ticks
+            connections.close_all()
+
+
+def _start_flush_thread():
+    global _flush_thread_pid
+    pid = os.getpid()
+    if _flush_thread_pid == pid:
+        return
+    with _lock:
+        if _flush_thread_pid == pid:
+            return
+        _flush_thread_pid = pid
+    threading.Thread(target=_flush_periodically, name='article-view-flush', daemon=True).start()
+
+
+@atexit.register
+def _flush_at_exit():
+    # Best effort: views lost here are within the counters' approximation
+    try:
+        push_buffered_views()
+        flush_view_counts()
+    except DatabaseError:
+        pass
@@ -1,52 +1,111 @@
 """
 Currency utility functions for formatting and conversion
 """
-from .models import UserProfile
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+from .models import UserProfile, COUNTRY_CURRENCY_MAP
+
+
+DEFAULT_CURRENCY = {'code': 'USD', 'symbol': '$'}
+
+# Symbols written after the amount (e.g. "1,234.50 €")
+SUFFIX_SYMBOLS = frozenset(['€', '£', '¥', '₹', '₽', '₺'])
+
+# ISO 4217 currencies without minor units
+ZERO_DECIMAL_CURRENCIES = frozenset(['JPY', 'KRW', 'VND'])
+
+
+class CurrencyFormatter:
+    """Decimal-exact formatter for one currency, built once and reused"""
+    __slots__ = ('code', 'symbol', 'decimal_places', '_quantum', '_prefix', '_suffix')
+
+    def __init__(self, code, symbol, decimal_places=2):
+        self.code = code
+        self.symbol = symbol
+        self.decimal_places = decimal_places
+        self._quantum = Decimal(1).scaleb(-decimal_places)
+        if symbol in SUFFIX_SYMBOLS:
+            self._prefix, self._suffix = '', f' {symbol}'
+        else:
+            self._prefix, self._suffix = symbol, ''
+
+    def __repr__(self):
+        return f"<CurrencyFormatter {self.code} {self.symbol!r} {self.decimal_places}dp>"
+
+    def format(self, amount):
+        """Format a single amount"""
+        if amount is None:
+            amount = 0
+        if not isinstance(amount, Decimal):
+            amount = Decimal(str(amount))
+        return f"{self._prefix}{amount.quantize(self._quantum, ROUND_HALF_UP):,}{self._suffix}"
+
+    def format_many(self, amounts):
+        """Format a column of amounts"""
+        format_amount = self.format
+        return [format_amount(amount) for amount in amounts]
+
+
+def _build_registry():
+    registry = {}
+    for currency in COUNTRY_CURRENCY_MAP.values():
+        code = currency['code']
+        if code not in registry:
+            decimal_places = 0 if code in ZERO_DECIMAL_CURRENCIES else 2
+            registry[code] = CurrencyFormatter(code, currency['symbol'], decimal_places)
+    return registry
+
+
+# Formatters for every supported ISO code, built once at import
+CURRENCY_FORMATTERS = _build_registry()
+
+
+@lru_cache(maxsize=None)
+def _custom_formatter(code, symbol, decimal_places):
+    return CurrencyFormatter(code, symbol, decimal_places)
+
+
+def get_currency_formatter(code=None, symbol=None):
+    """Get the formatter for an ISO code, honouring a custom symbol if given"""
+    formatter = CURRENCY_FORMATTERS.get(code)
+    if formatter is not None and (symbol is None or symbol == formatter.symbol):
+        return formatter
+    decimal_places = 0 if code in ZERO_DECIMAL_CURRENCIES else 2
+    return _custom_formatter(code, symbol or DEFAULT_CURRENCY['symbol'], decimal_places)
 
 
 def get_user_currency(user):
-    """Get currency information for a user"""
+    """Get currency information for a user (memoized on the user object)"""
+    currency = getattr(user, '_currency_info', None)
+    if currency is not None:
+        return currency
     try:
         profile = user.profile
-        return {
-            'code': profile.currency_code,
-            'symbol': profile.currency_symbol,
-        }
     except UserProfile.DoesNotExist:
         # Create profile if it doesn't exist
-        profile = UserProfile.objects.create(
+        profile, created = UserProfile.objects.get_or_create(
             user=user,
-            country='US',
-            currency_code='USD',
-            currency_symbol='$'
+            defaults={
+                'country': 'US',
+                'currency_code': 'USD',
+                'currency_symbol': '$',
+            }
         )
-        return {
-            'code': profile.currency_code,
-            'symbol': profile.currency_symbol,
-        }
+    currency = {
+        'code': profile.currency_code,
+        'symbol': profile.currency_symbol,
+    }
+    user._currency_info = currency
+    return currency
 
 
 def format_currency(amount, currency_symbol='$', decimal_places=2):
     """Format amount with currency symbol"""
-    if amount is None:
-        amount = 0
-    
-    # Format number with proper decimal places
-    formatted_amount = f"{float(amount):,.{decimal_places}f}"
-    
-    # Handle currencies with symbol after amount
-    if currency_symbol in ['€', '£', '¥', '₹', '₽', '₺']:
-        return f"{formatted_amount} {currency_symbol}"
-    else:
-        return f"{currency_symbol}{formatted_amount}"
+    return _custom_formatter(None, currency_symbol, decimal_places).format(amount)
 
 
 def get_currency_for_user(user):
     """Get currency symbol for user (for template use)"""
     currency = get_user_currency(user)
     return currency['symbol']
-
-
-
-
-
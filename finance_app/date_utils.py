@@ -0,0 +1,38 @@
+"""
+Calendar month helpers that produce index-friendly half-open date ranges
+"""
+from datetime import date
+
+from django.utils import timezone
+
+
+def shift_month(year, month, delta):
+    """Return the (year, month) that is delta calendar months away"""
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+def month_range(year, month):
+    """Return (start, end) dates for a month; end is the first day of the next month"""
+    next_year, next_month = shift_month(year, month, 1)
+    return date(year, month, 1), date(next_year, next_month, 1)
+
+
+def month_range_filter(year, month, field='date'):
+    """Return filter kwargs selecting one month as a half-open range on field"""
+    start, end = month_range(year, month)
+    return {f'{field}__gte': start, f'{field}__lt': end}
+
+
+def last_n_months(n, today=None):
+    """Return the last n calendar months as (year, month) pairs, oldest first"""
+    today = today or timezone.localdate()
+    return [shift_month(today.year, today.month, -i) for i in range(n - 1, -1, -1)]
+
+
+def last_n_months_range(n, today=None):
+    """Return (start, end) dates covering the last n calendar months including the current one"""
+    months = last_n_months(n, today)
+    start, _ = month_range(*months[0])
+    _, end = month_range(*months[-1])
+    return start, end
@@ -1,9 +1,49 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.forms.models import ModelChoiceIterator
+from .category_cache import get_categories, get_category
 from .models import Expense, Budget, Category, Goal, Article, UserProfile
 
 
+class CachedCategoryIterator(ModelChoiceIterator):
+    """Category choices from the process-local category cache"""
+    
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for category in get_categories():
+            yield self.choice(category)
+    
+    def __len__(self):
+        return len(get_categories()) + (1 if self.field.empty_label is not None else 0)
+    
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(get_categories())
+
+
+class CachedCategoryChoiceField(forms.ModelChoiceField):
+    """Category choice field that renders from the category cache without querying"""
+    iterator = CachedCategoryIterator
+    
+    def __init__(self, **kwargs):
+        kwargs.setdefault('queryset', Category.objects.all())
+        super().__init__(**kwargs)
+    
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            category = get_category(int(value))
+        except (TypeError, ValueError):
+            category = None
+        # Another worker may have deleted it while this one's cache is stale
+        if category is not None and self.queryset.filter(pk=category.pk).exists():
+            return category
+        # Not cached (or not an id): let the queryset decide
+        return super().to_python(value)
+
+
 class SignUpForm(UserCreationForm):
     email = forms.EmailField(required=True, widget=forms.EmailInput(attrs={
         'class': 'form-control',
@@ -87,12 +127,15 @@ class SignUpForm(UserCreationForm):
 
 
 class ExpenseForm(forms.ModelForm):
+    category = CachedCategoryChoiceField(
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    
     class Meta:
         model = Expense
         fields = ['title', 'category', 'description', 'amount', 'date']
         widgets = {
             'title': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Expense title'}),
-            'category': forms.Select(attrs={'class': 'form-select'}),
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3, 'placeholder': 'Description (optional)'}),
             'amount': forms.NumberInput(attrs={'class': 'form-control', 'placeholder': '0.00', 'step': '0.01', 'min': '0.01'}),
             'date': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
@@ -111,8 +154,7 @@ class BudgetForm(forms.ModelForm):
 
 
 class ExpenseFilterForm(forms.Form):
-    category = forms.ModelChoiceField(
-        queryset=Category.objects.all(),
+    category = CachedCategoryChoiceField(
         required=False,
         empty_label="All Categories",
         widget=forms.Select(attrs={'class': 'form-select'})
@@ -133,6 +175,28 @@ class ExpenseFilterForm(forms.Form):
         required=False,
         widget=forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0'})
     )
+    
+    def filter_queryset(self, expenses):
+        """Apply the submitted filters to an Expense queryset (unfiltered if the form is invalid)"""
+        if not self.is_valid():
+            return expenses
+        category = self.cleaned_data.get('category')
+        start_date = self.cleaned_data.get('start_date')
+        end_date = self.cleaned_data.get('end_date')
+        min_amount = self.cleaned_data.get('min_amount')
+        max_amount = self.cleaned_data.get('max_amount')
+        
+        if category:
+            expenses = expenses.filter(category=category)
+        if start_date:
+            expenses = expenses.filter(date__gte=start_date)
+        if end_date:
+            expenses = expenses.filter(date__lte=end_date)
+        if min_amount:
+            expenses = expenses.filter(amount__gte=min_amount)
+        if max_amount:
+            expenses = expenses.filter(amount__lte=max_amount)
+        return expenses
 
 
 class GoalForm(forms.ModelForm):
@@ -0,0 +1,212 @@
+"""
+Rules-based spending insights for the local tips backend
+
+One query feeds every rule: the user's expenses for the current month and
+the HISTORY_MONTHS before it. The budget comes from the spending summary
+the caller has already built. One pass over the expenses accumulates the
+per-month, per-category and month-to-date figures the rules compare, so a
+full set of insights takes a few milliseconds and no network round trip.
+"""
+import calendar
+from collections import defaultdict
+from statistics import median
+
+from django.utils import timezone
+
+from .date_utils import month_range, shift_month
+from .models import Expense
+
+HISTORY_MONTHS = 3
+
+# Rules only produce a tip past these thresholds
+PACE_CHANGE_PERCENT = 15
+SHARE_SHIFT_POINTS = 10
+UNUSUAL_MULTIPLE = 2.5
+UNUSUAL_MIN_SAMPLES = 4
+
+
+class SpendingHistory:
+    """Totals accumulated in one pass over recent expenses"""
+
+    def __init__(self, rows, today):
+        self.today = today
+        self.this_month = (today.year, today.month)
+        self.last_month = shift_month(today.year, today.month, -1)
+        self.past_months = [shift_month(today.year, today.month, -i) for i in range(1, HISTORY_MONTHS + 1)]
+
+        self.month_totals = defaultdict(float)
+        self.category_totals = defaultdict(lambda: defaultdict(float))
+        # Last month up to the same day of the month, per category
+        self.last_month_to_date = defaultdict(float)
+        # Amounts before this month, per category, for spotting outliers
+        self.past_amounts = defaultdict(list)
+        self.current = []
+
+        for day, amount, category in rows:
+            amount = float(amount)
+            category = category or 'Uncategorized'
+            month = (day.year, day.month)
+            self.month_totals[month] += amount
+            self.category_totals[month][category] += amount
+            if month == self.this_month:
+                self.current.append((day, amount, category))
+            else:
+                self.past_amounts[category].append(amount)
+                if month == self.last_month and day.day <= today.day:
+                    self.last_month_to_date[category] += amount
+
+    @property
+    def spent(self):
+        return self.month_totals[self.this_month]
+
+    @property
+    def current_categories(self):
+        return self.category_totals[self.this_month]
+
+    def past_average(self):
+        """Average monthly total over past months that had any spending"""
+        totals = [self.month_totals[month] for month in self.past_months if self.month_totals[month]]
+        return sum(totals) / len(totals) if totals else 0
+
+
+def budget_tip(history, budget, symbol):
+    today = history.today
+    spent = history.spent
+    if budget is None:
+        average = history.past_average()
+        if not average:
+            return None
+        return (
+            f"You haven't set a budget for this month. You've averaged {symbol}{average:.2f} a month "
+            f"recently, so a budget of about {symbol}{average * 0.95:.2f} is a realistic first target."
+        )
+
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+    days_left = days_in_month - today.day
+    if spent > budget:
+        return (
+            f"You're already {symbol}{spent - budget:.2f} over this month's {symbol}{budget:.2f} budget. "
+            f"Pause non-essential purchases for the remaining {days_left} days and check which "
+            f"categories pushed you over."
+        )
+    # On the last day the month's total is simply what's been spent
+    projected = spent / today.day * days_in_month if days_left else spent
+    if projected > budget:
+        allowance = (budget - spent) / days_left
+        return (
+            f"At your current pace you'll spend about {symbol}{projected:.2f} this month, "
+            f"{symbol}{projected - budget:.2f} over your {symbol}{budget:.2f} budget. Keeping to "
+            f"{symbol}{allowance:.2f} a day for the remaining {days_left} days keeps you on budget."
+        )
+    if not spent:
+        return None
+    return (
+        f"You're on track to finish the month around {symbol}{projected:.2f}, under your "
+        f"{symbol}{budget:.2f} budget. Move the expected {symbol}{budget - projected:.2f} surplus "
+        f"into savings now so it doesn't get spent."
+    )
+
+
+def pace_tip(history, symbol):
+    """This month so far against the same days of last month"""
+    now = history.spent
+    before = sum(history.last_month_to_date.values())
+    if not now or not before:
+        return None
+    change = (now - before) / before * 100
+    if change >= PACE_CHANGE_PERCENT:
+        current = history.current_categories
+        driver = max(current, key=lambda name: current[name] - history.last_month_to_date[name])
+        increase = current[driver] - history.last_month_to_date[driver]
+        return (
+            f"You've spent {change:.0f}% more than at this point last month ({symbol}{now:.2f} vs "
+            f"{symbol}{before:.2f}). Most of the increase is in {driver} (+{symbol}{increase:.2f})."
+        )
+    if change <= -PACE_CHANGE_PERCENT:
+        return (
+            f"Nice work: you've spent {-change:.0f}% less than at this point last month "
+            f"({symbol}{now:.2f} vs {symbol}{before:.2f}). Set the difference aside now to lock in the saving."
+        )
+    return None
+
+
+def unusual_expense_tip(history, symbol):
+    """The expense this month furthest above what's typical for its category"""
+    typical = {}
+    outlier = None
+    for day, amount, category in history.current:
+        past = history.past_amounts[category]
+        if len(past) < UNUSUAL_MIN_SAMPLES:
+            continue
+        if category not in typical:
+            typical[category] = median(past)
+        ratio = amount / typical[category] if typical[category] else 0
+        if ratio >= UNUSUAL_MULTIPLE and (outlier is None or ratio > outlier[0]):
+            outlier = (ratio, day, amount, category)
+    if outlier is None:
+        return None
+    ratio, day, amount, category = outlier
+    return (
+        f"A {symbol}{amount:.2f} {category} expense on {day:%b} {day.day} is {ratio:.1f}x your typical "
+        f"{category} expense of {symbol}{typical[category]:.2f}. If it wasn't planned, look for a "
+        f"cheaper alternative next time."
+    )
+
+
+def share_shift_tip(history):
+    """The category whose share of spending grew most against recent months"""
+    now = history.spent
+    previous = [month for month in history.past_months if history.month_totals[month]]
+    if not now or not previous:
+        return None
+    best = None
+    for category, amount in history.current_categories.items():
+        share = amount / now * 100
+        before = sum(
+            history.category_totals[month][category] / history.month_totals[month] * 100
+            for month in previous
+        ) / len(previous)
+        if best is None or share - before > best[0]:
+            best = (share - before, category, share, before)
+    if best is None or best[0] < SHARE_SHIFT_POINTS:
+        return None
+    _, category, share, before = best
+    return (
+        f"{category} makes up {share:.0f}% of your spending this month, up from {before:.0f}% in "
+        f"recent months. Check whether that's a one-off or a new habit worth its own limit."
+    )
+
+
+def top_category_tip(history, symbol):
+    current = history.current_categories
+    if not current:
+        return None
+    category = max(current, key=current.get)
+    amount = current[category]
+    return (
+        f"{category} is your biggest expense this month at {symbol}{amount:.2f} "
+        f"({amount / history.spent * 100:.0f}% of spending). Trimming it by 10% would save about "
+        f"{symbol}{amount * 0.1:.2f} a month."
+    )
+
+
+def spending_insights(user_id, budget, currency_symbol, today=None):
+    """Tips derived from the user's own spending, most pressing first
+
+    ``budget`` is this month's budget amount, or None if there isn't one.
+    """
+    today = today or timezone.localdate()
+    start, _ = month_range(*shift_month(today.year, today.month, -HISTORY_MONTHS))
+    rows = Expense.objects.filter(
+        user_id=user_id, date__gte=start, date__lte=today
+    ).order_by().values_list('date', 'amount', 'category__name')
+
+    history = SpendingHistory(rows, today)
+    tips = [
+        budget_tip(history, budget, currency_symbol),
+        pace_tip(history, currency_symbol),
+        unusual_expense_tip(history, currency_symbol),
+        share_shift_tip(history),
+        top_category_tip(history, currency_symbol),
+    ]
+    return [tip for tip in tips if tip]
@@ -0,0 +1,19 @@
+"""
+Management command that checks every finance_app URL against a SQL query budget
+
+The budgets, seed data and assertions live in finance_app.tests.QueryBudgetTests
+so they also run under ``manage.py test`` and in CI; this command runs just
+that test case. A view fails its budget if it runs more queries than allowed
+or repeats the same query shape (the signature of an N+1 loop) more often than
+allowed, and the failure lists the offending SQL.
+"""
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Checks every finance_app view against its declared SQL query budget'
+
+    def handle(self, *args, **options):
+        # The test command exits non-zero if any view is over budget
+        call_command('test', 'finance_app.tests.QueryBudgetTests', verbosity=options['verbosity'])
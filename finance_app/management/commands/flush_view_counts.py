@@ -0,0 +1,25 @@
+"""
+Management command to write buffered article view counts to the database
+"""
+from django.core.management.base import BaseCommand
+from finance_app.counters import sweep_view_counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Writes article views still pending in the shared cache to the database '
+        '(schedule periodically to pick up counts left by exited processes; needs a cache '
+        'shared with the web processes, i.e. REDIS_URL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of articles to check per cache round trip',
+        )
+
+    def handle(self, *args, **options):
+        written = sweep_view_counts(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Flushed {written} article views'))
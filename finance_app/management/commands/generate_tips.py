@@ -0,0 +1,124 @@
+"""
+Management command to generate AI tips ahead of time for recently active users
+"""
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from finance_app.models import Expense, GeneratedTips
+from finance_app.tips import get_tip_backend, save_tips_batch, tips_fingerprint, user_spending_summary
+
+
+def active_user_ids(days):
+    """Ids of users who logged in or added an expense in the last ``days`` days"""
+    since = timezone.now() - timedelta(days=days)
+    recent_spenders = Expense.objects.filter(created_at__gte=since).values('user_id')
+    return User.objects.filter(
+        Q(last_login__gte=since) | Q(pk__in=recent_spenders), is_active=True
+    ).order_by('pk').values_list('pk', flat=True)
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates savings tips from the remote tips backend for recently active users so the '
+        'AI Tips page can serve them instantly (schedule nightly; with the OpenAI backend it '
+        'requires OPENAI_API_KEY, and honours OPENAI_API_URL so it can be run against a local '
+        'stub server)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='Include users who logged in or added an expense within this many days',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=100,
+            help='Number of users to summarise and store per batch',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Maximum number of concurrent requests to the AI service',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate tips even when the stored ones match the current spending',
+        )
+
+    def handle(self, *args, **options):
+        backend = get_tip_backend()
+        if not backend.remote:
+            raise CommandError(
+                'Tips come from a local backend and are computed on demand; nothing to pre-generate '
+                '(check TIPS_BACKEND and OPENAI_API_KEY)'
+            )
+
+        chunk_size = options['chunk_size']
+        totals = Counter()
+        failures = Counter()
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            chunk = []
+            for user_id in active_user_ids(options['days']).iterator(chunk_size=chunk_size):
+                chunk.append(user_id)
+                if len(chunk) == chunk_size:
+                    self.process_chunk(chunk, backend, executor, options['force'], totals, failures)
+                    chunk = []
+            if chunk:
+                self.process_chunk(chunk, backend, executor, options['force'], totals, failures)
+
+        elapsed = time.perf_counter() - started
+        rate = totals['generated'] / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated tips for {totals['generated']} of {totals['users']} users in {elapsed:.1f}s "
+            f"({rate:.1f} users/s); {totals['unchanged']} unchanged, {totals['failed']} failed"
+        ))
+        for reason, count in failures.most_common():
+            self.stdout.write(self.style.WARNING(f'  {count} x {reason}'))
+
+    def process_chunk(self, user_ids, backend, executor, force, totals, failures):
+        users = User.objects.filter(pk__in=user_ids).select_related('profile').order_by('pk')
+        stored = dict(
+            GeneratedTips.objects.filter(user_id__in=user_ids).values_list('user_id', 'fingerprint')
+        )
+        totals['users'] += len(user_ids)
+
+        # Summaries touch the database, so they're built here; only the
+        # backend requests run in the pool
+        pending = []
+        for user in users:
+            spending_summary, currency_symbol = user_spending_summary(user)
+            fingerprint = tips_fingerprint(spending_summary, currency_symbol)
+            if not force and stored.get(user.pk) == fingerprint:
+                totals['unchanged'] += 1
+                continue
+            future = executor.submit(backend.generate, user.pk, spending_summary, currency_symbol)
+            pending.append((user.pk, fingerprint, future))
+
+        generated = {}
+        for user_id, fingerprint, future in pending:
+            try:
+                generated[user_id] = (fingerprint, future.result())
+            except Exception as e:
+                totals['failed'] += 1
+                failures[f'{type(e).__name__}: {e}'[:200]] += 1
+
+        if generated:
+            save_tips_batch(generated)
+        totals['generated'] += len(generated)
+        self.stdout.write(
+            f"{totals['users']} users processed ({totals['generated']} generated, "
+            f"{totals['unchanged']} unchanged, {totals['failed']} failed)"
+        )
@@ -0,0 +1,34 @@
+"""
+Management command to rebuild the monthly category spending rollups
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from finance_app.models import MonthlyCategorySpend
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds monthly category spending rollups from raw expenses (run after bulk loads); '
+        'cached dashboards and reports of the affected users are invalidated'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            help='Only rebuild rollups for this username',
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist")
+
+        created_count = MonthlyCategorySpend.rebuild(user=user)
+
+        scope = f"user {user.username}" if user else "all users"
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {created_count} rollup rows for {scope}')
+        )
@@ -0,0 +1,124 @@
+"""
+Management command that runs queued background export jobs
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from finance_app.exports import EXPORT_LEASE_SECONDS, EXPORT_MAX_ATTEMPTS, purge_old_exports, run_export_job
+from finance_app.models import ExportJob
+
+# How often a running worker deletes expired export jobs and files
+PURGE_INTERVAL_SECONDS = 60 * 60
+
+
+def requeue_stale_jobs():
+    """
+    Put running jobs whose worker stopped reporting progress back in the
+    queue, or fail them once they've used up their attempts
+
+    Returns (requeued, failed) counts.
+    """
+    now = timezone.now()
+    stale = ExportJob.objects.filter(status='running').filter(
+        Q(heartbeat_at__lt=now - timedelta(seconds=EXPORT_LEASE_SECONDS)) | Q(heartbeat_at__isnull=True)
+    )
+    failed = stale.filter(attempts__gte=EXPORT_MAX_ATTEMPTS).update(
+        status='failed',
+        error='The export worker stopped responding while running this job',
+        finished_at=now,
+    )
+    requeued = stale.update(status='pending', progress=0, heartbeat_at=None)
+    return requeued, failed
+
+
+def claim_next_job():
+    """Claim the oldest pending job; concurrent workers skip rows another worker has locked"""
+    with transaction.atomic():
+        job = ExportJob.objects.select_for_update(skip_locked=True).filter(
+            status='pending'
+        ).order_by('created_at').first()
+        if job is None:
+            return None
+        # The conditional update also keeps claims exclusive on backends
+        # without SELECT ... FOR UPDATE (SQLite)
+        now = timezone.now()
+        claimed = ExportJob.objects.filter(pk=job.pk, status='pending').update(
+            status='running', started_at=now, heartbeat_at=now, attempts=F('attempts') + 1
+        )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs pending CSV/PDF export jobs (keep running as its own worker process); '
+        'jobs left running by a stopped worker are requeued and expired exports are deleted'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when there are no pending jobs instead of polling',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the queue is empty',
+        )
+
+    def handle(self, *args, **options):
+        self.next_purge = 0
+        while True:
+            try:
+                ran = self.run_next_job()
+            except Exception as e:
+                if options['once']:
+                    raise
+                # Keep polling through transient errors (e.g. a dropped
+                # database connection); a job cut short is requeued once its
+                # heartbeat goes stale
+                self.stderr.write(self.style.ERROR(f'Export worker error, retrying: {e}'))
+                close_old_connections()
+                ran = False
+            if not ran:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+
+    def run_next_job(self):
+        """Requeue abandoned jobs, then run the oldest pending one; False if there was none"""
+        if time.monotonic() >= self.next_purge:
+            purged = purge_old_exports()
+            if purged:
+                self.stdout.write(f'Deleted {purged} expired export jobs')
+            self.next_purge = time.monotonic() + PURGE_INTERVAL_SECONDS
+        requeued, failed = requeue_stale_jobs()
+        if requeued or failed:
+            self.stdout.write(self.style.WARNING(
+                f'Requeued {requeued} and failed {failed} export jobs abandoned by a stopped worker'
+            ))
+        job = claim_next_job()
+        if job is None:
+            return False
+
+        self.stdout.write(f'Running export job {job.pk} ({job.format}) for {job.user.username}')
+        try:
+            run_export_job(job)
+        except Exception as e:
+            ExportJob.objects.filter(pk=job.pk).update(
+                status='failed', error=str(e), finished_at=timezone.now()
+            )
+            self.stdout.write(self.style.ERROR(f'Export job {job.pk} failed: {e}'))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f'Export job {job.pk} completed ({job.total_rows} rows)')
+            )
+        return True
@@ -0,0 +1,66 @@
+"""
+Middleware for per-request user data
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.utils.functional import SimpleLazyObject
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .currency_utils import DEFAULT_CURRENCY, get_user_currency
+
+
+def get_request_currency(request):
+    """Resolve the currency for the request's user (default currency for anonymous users)"""
+    if request.user.is_authenticated:
+        return get_user_currency(request.user)
+    return DEFAULT_CURRENCY
+
+
+class CurrencyMiddleware:
+    """Attach the user's currency to the request as request.currency, resolved once per request"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.currency = SimpleLazyObject(lambda: get_request_currency(request))
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Still lazy: resolving it touches the ORM, which async views must do
+        # through sync_to_async
+        request.currency = SimpleLazyObject(lambda: get_request_currency(request))
+        return await self.get_response(request)
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoiseMiddleware that also runs in an async middleware chain"""
+    # WhiteNoise itself is sync-only, so under ASGI Django would run every
+    # request through a single thread and async views would queue behind each other
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            # Opening the file touches the disk; only static requests pay for that
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:12
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def backfill_rollups(apps, schema_editor):
+    Expense = apps.get_model('finance_app', 'Expense')
+    MonthlyCategorySpend = apps.get_model('finance_app', 'MonthlyCategorySpend')
+    rows = Expense.objects.order_by().annotate(
+        year=ExtractYear('date'),
+        month=ExtractMonth('date'),
+    ).values('user_id', 'year', 'month', 'category_id').annotate(
+        total=Sum('amount'),
+        count=Count('id'),
+    )
+    MonthlyCategorySpend.objects.bulk_create(
+        (MonthlyCategorySpend(**row) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance_app', '0004_userprofile'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCategorySpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(12)])),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_spend', to='finance_app.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_spend', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Monthly category spend',
+                'ordering': ['-year', '-month'],
+                'indexes': [models.Index(fields=['user', '-year', '-month'], name='finance_app_user_id_342d38_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'year', 'month', 'category'), name='unique_monthly_category_spend')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:18
+
+import django.core.validators
+import django.db.models.deletion
+import finance_app.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance_app', '0005_monthlycategoryspend'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('pdf', 'PDF')], max_length=10)),
+                ('filters', models.JSONField(blank=True, default=dict, help_text='ExpenseFilterForm parameters')),
+                ('fingerprint', models.CharField(help_text='Hash of format, filters, currency and dataset state', max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('progress', models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)])),
+                ('total_rows', models.IntegerField(default=0)),
+                ('artifact', models.FileField(blank=True, storage=finance_app.models.get_export_storage, upload_to='%Y/%m/')),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='finance_app_status_b3dc56_idx'), models.Index(fields=['user', 'fingerprint'], name='finance_app_user_id_22fea7_idx')],
+            },
+        ),
+    ]
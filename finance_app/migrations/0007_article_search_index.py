@@ -0,0 +1,103 @@
+from django.db import migrations
+
+
+class VendorRunSQL(migrations.RunSQL):
+    """RunSQL applied only on one database vendor (on SQLite, only when FTS5 is compiled in)"""
+
+    def __init__(self, vendor, sql, reverse_sql):
+        self.vendor = vendor
+        super().__init__(sql, reverse_sql)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        return name, [self.vendor, *args], kwargs
+
+    def applies_to(self, connection):
+        if connection.vendor != self.vendor:
+            return False
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+                return bool(cursor.fetchone()[0])
+        return True
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if self.applies_to(schema_editor.connection):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if self.applies_to(schema_editor.connection):
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance_app', '0006_exportjob'),
+    ]
+
+    operations = [
+        # PostgreSQL: weighted tsvector generated from title, summary and
+        # content, with a GIN index
+        VendorRunSQL(
+            'postgresql',
+            [
+                """
+                ALTER TABLE finance_app_article ADD COLUMN search_vector tsvector
+                GENERATED ALWAYS AS (
+                    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+                    setweight(to_tsvector('english', coalesce(content, '')), 'C')
+                ) STORED
+                """,
+                'CREATE INDEX finance_app_article_search_idx ON finance_app_article USING GIN (search_vector)',
+            ],
+            [
+                'DROP INDEX IF EXISTS finance_app_article_search_idx',
+                'ALTER TABLE finance_app_article DROP COLUMN IF EXISTS search_vector',
+            ],
+        ),
+        # SQLite: external-content FTS5 table kept in sync by triggers. Only
+        # changes to the indexed columns touch it, so view count updates
+        # don't pay for reindexing
+        VendorRunSQL(
+            'sqlite',
+            [
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS finance_app_article_fts USING fts5(
+                    title, summary, content,
+                    content='finance_app_article', content_rowid='id',
+                    tokenize='porter unicode61'
+                )
+                """,
+                """
+                CREATE TRIGGER IF NOT EXISTS finance_app_article_fts_ai AFTER INSERT ON finance_app_article BEGIN
+                    INSERT INTO finance_app_article_fts(rowid, title, summary, content)
+                    VALUES (new.id, new.title, new.summary, new.content);
+                END
+                """,
+                """
+                CREATE TRIGGER IF NOT EXISTS finance_app_article_fts_ad AFTER DELETE ON finance_app_article BEGIN
+                    INSERT INTO finance_app_article_fts(finance_app_article_fts, rowid, title, summary, content)
+                    VALUES ('delete', old.id, old.title, old.summary, old.content);
+                END
+                """,
+                """
+                CREATE TRIGGER IF NOT EXISTS finance_app_article_fts_au
+                AFTER UPDATE OF title, summary, content ON finance_app_article BEGIN
+                    INSERT INTO finance_app_article_fts(finance_app_article_fts, rowid, title, summary, content)
+                    VALUES ('delete', old.id, old.title, old.summary, old.content);
+                    INSERT INTO finance_app_article_fts(rowid, title, summary, content)
+                    VALUES (new.id, new.title, new.summary, new.content);
+                END
+                """,
+                "INSERT INTO finance_app_article_fts(finance_app_article_fts) VALUES ('rebuild')",
+            ],
+            [
+                'DROP TRIGGER IF EXISTS finance_app_article_fts_ai',
+                'DROP TRIGGER IF EXISTS finance_app_article_fts_ad',
+                'DROP TRIGGER IF EXISTS finance_app_article_fts_au',
+                'DROP TABLE IF EXISTS finance_app_article_fts',
+            ],
+        ),
+    ]
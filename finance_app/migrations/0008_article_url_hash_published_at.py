@@ -0,0 +1,107 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:29
+
+import hashlib
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_news_fields(apps, schema_editor):
+    # Existing news only kept a truncated URL in `source`; hash that, keeping
+    # the first item where truncation made two URLs collide
+    Article = apps.get_model('finance_app', 'Article')
+    seen = set()
+    updated = []
+    for article in Article.objects.filter(article_type='news').order_by('created_at').iterator():
+        article.published_at = article.created_at
+        if article.source:
+            url_hash = hashlib.sha256(article.source.encode('utf-8')).hexdigest()
+            if url_hash not in seen:
+                seen.add(url_hash)
+                article.url_hash = url_hash
+        updated.append(article)
+    Article.objects.bulk_update(updated, ['published_at', 'url_hash'], batch_size=500)
+
+
+class VendorRunSQL(migrations.RunSQL):
+    """RunSQL applied only on one database vendor (on SQLite, only when FTS5 is compiled in)"""
+
+    def __init__(self, vendor, sql, reverse_sql):
+        self.vendor = vendor
+        super().__init__(sql, reverse_sql)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        return name, [self.vendor, *args], kwargs
+
+    def applies_to(self, connection):
+        if connection.vendor != self.vendor:
+            return False
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+                return bool(cursor.fetchone()[0])
+        return True
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if self.applies_to(schema_editor.connection):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if self.applies_to(schema_editor.connection):
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance_app', '0007_article_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='published_at',
+            field=models.DateTimeField(blank=True, help_text='Publication time reported by the news source', null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='url_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the full source URL (news only; used to deduplicate ingestion)', max_length=64, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['article_type', '-published_at'], name='finance_app_article_600f46_idx'),
+        ),
+        # Adding a unique column rebuilds the table on SQLite, dropping the
+        # search triggers from 0007
+        VendorRunSQL(
+            'sqlite',
+            [
+                """
+                CREATE TRIGGER IF NOT EXISTS finance_app_article_fts_ai AFTER INSERT ON finance_app_article BEGIN
+                    INSERT INTO finance_app_article_fts(rowid, title, summary, content)
+                    VALUES (new.id, new.title, new.summary, new.content);
+                END
+                """,
+                """
+                CREATE TRIGGER IF NOT EXISTS finance_app_article_fts_ad AFTER DELETE ON finance_app_article BEGIN
+                    INSERT INTO finance_app_article_fts(finance_app_article_fts, rowid, title, summary, content)
+                    VALUES ('delete', old.id, old.title, old.summary, old.content);
+                END
+                """,
+                """
+                CREATE TRIGGER IF NOT EXISTS finance_app_article_fts_au
+                AFTER UPDATE OF title, summary, content ON finance_app_article BEGIN
+                    INSERT INTO finance_app_article_fts(finance_app_article_fts, rowid, title, summary, content)
+                    VALUES ('delete', old.id, old.title, old.summary, old.content);
+                    INSERT INTO finance_app_article_fts(rowid, title, summary, content)
+                    VALUES (new.id, new.title, new.summary, new.content);
+                END
+                """,
+            ],
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunPython(backfill_news_fields, migrations.RunPython.noop),
+    ]
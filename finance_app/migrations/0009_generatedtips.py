@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance_app', '0008_article_url_hash_published_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeneratedTips',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(help_text='Hash of the spending summary and currency the tips were generated from', max_length=16)),
+                ('tips', models.JSONField(default=list)),
+                ('generated_at', models.DateTimeField()),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='generated_tips', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Generated Tips',
+                'verbose_name_plural': 'Generated Tips',
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def rebuild_duplicate_uncategorized_buckets(apps, schema_editor):
+    """
+    Replace duplicated uncategorized buckets with one recomputed from the
+    expenses (every delta after the duplicate was created went to both rows,
+    so their totals can't simply be added)
+    """
+    Expense = apps.get_model('finance_app', 'Expense')
+    MonthlyCategorySpend = apps.get_model('finance_app', 'MonthlyCategorySpend')
+    uncategorized = MonthlyCategorySpend.objects.filter(category__isnull=True)
+    duplicated = list(uncategorized.order_by().values('user_id', 'year', 'month').annotate(
+        buckets=Count('id'),
+    ).filter(buckets__gt=1))
+    for row in duplicated:
+        user_id, year, month = row['user_id'], row['year'], row['month']
+        uncategorized.filter(user_id=user_id, year=year, month=month).delete()
+        totals = Expense.objects.filter(
+            user_id=user_id, category__isnull=True, date__year=year, date__month=month
+        ).aggregate(total=Sum('amount'), count=Count('id'))
+        if totals['count']:
+            MonthlyCategorySpend.objects.create(
+                user_id=user_id, year=year, month=month, category=None,
+                total=totals['total'], count=totals['count'],
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance_app', '0009_generatedtips'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_duplicate_uncategorized_buckets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='monthlycategoryspend',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('user', 'year', 'month'), name='unique_monthly_uncategorized_spend'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance_app', '0010_monthly_uncategorized_spend_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='data_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False, help_text="Bumped whenever the user's expenses, budgets or goals change; keys their cached figures"),
+        ),
+    ]
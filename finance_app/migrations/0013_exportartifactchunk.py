@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance_app', '0012_exportjob_heartbeat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportArtifactChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('index', models.IntegerField()),
+                ('data', models.BinaryField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('name', 'index'), name='unique_export_artifact_chunk')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance_app', '0013_exportartifactchunk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsIngestGap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('published_after', models.DateTimeField(help_text='Newest stored news item when the interrupted run started')),
+                ('published_before', models.DateTimeField(help_text='Oldest item fetched so far; older items in the window are still missing')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['published_before'],
+            },
+        ),
+    ]
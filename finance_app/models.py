@@ -1,10 +1,16 @@
-from django.db import models
+from django.db import connections, models, transaction, IntegrityError
+from django.db.models import F, Q, Sum, Count, Case, When, Value, Subquery, OuterRef, ExpressionWrapper, BooleanField, DecimalField, FloatField
+from django.db.models.functions import ExtractYear, ExtractMonth, Cast, Coalesce, Least, Round
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
-from django.db.models.signals import post_save
+from django.db.models.signals import post_migrate, post_save, post_delete, pre_save, pre_delete
 from django.dispatch import receiver
 
+from .cache_utils import bump_category_version
+from .date_utils import month_range_filter
+from .search import restore_sqlite_search_triggers
+
 
 class Category(models.Model):
     """Expense categories"""
@@ -40,6 +46,132 @@ class Expense(models.Model):
     
     def __str__(self):
         return f"{self.title} - ${self.amount} ({self.user.username})"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember which rollup bucket the stored row belongs to so that
+        # edits can be moved out of the old bucket on save
+        if all(name in field_names for name in ('user_id', 'category_id', 'date', 'amount')):
+            instance._rollup_bucket = instance.get_rollup_bucket()
+        return instance
+    
+    def get_rollup_bucket(self):
+        """Return the (user_id, year, month, category_id, amount) rollup key for this expense"""
+        # Unsaved values may still be strings or datetimes
+        date = self._meta.get_field('date').to_python(self.date)
+        amount = self._meta.get_field('amount').to_python(self.amount)
+        return (self.user_id, date.year, date.month, self.category_id, amount)
+
+
+class MonthlyCategorySpend(models.Model):
+    """Per-user monthly spending rollup by category, kept current by Expense signals"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_spend')
+    year = models.IntegerField()
+    month = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(12)])
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True, related_name='monthly_spend')
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name_plural = "Monthly category spend"
+        ordering = ['-year', '-month']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'year', 'month', 'category'], name='unique_monthly_category_spend'),
+            # NULLs are distinct in the constraint above, so the uncategorized
+            # bucket needs its own
+            models.UniqueConstraint(
+                fields=['user', 'year', 'month'],
+                condition=Q(category__isnull=True),
+                name='unique_monthly_uncategorized_spend',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-year', '-month']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.month}/{self.year} - {self.category_id}: {self.total} ({self.count})"
+    
+    @classmethod
+    def apply_delta(cls, user_id, year, month, category_id, amount, count):
+        """Add amount/count to a single rollup bucket, creating it if needed"""
+        bucket = cls.objects.filter(user_id=user_id, year=year, month=month, category_id=category_id)
+        if bucket.update(total=F('total') + amount, count=F('count') + count):
+            if count < 0:
+                bucket.filter(count__lte=0).delete()
+            return
+        if count <= 0:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    user_id=user_id, year=year, month=month,
+                    category_id=category_id, total=amount, count=count
+                )
+        except IntegrityError:
+            # Another request created the bucket first
+            bucket.update(total=F('total') + amount, count=F('count') + count)
+    
+    @classmethod
+    def rebuild(cls, user=None):
+        """
+        Recompute rollups from raw expenses (for bulk loads that bypass
+        signals) and invalidate the cached figures of every user affected
+        """
+        expenses = Expense.objects.all()
+        rollups = cls.objects.all()
+        if user is not None:
+            expenses = expenses.filter(user=user)
+            rollups = rollups.filter(user=user)
+        
+        rows = expenses.order_by().annotate(
+            year=ExtractYear('date'),
+            month=ExtractMonth('date'),
+        ).values('user_id', 'year', 'month', 'category_id').annotate(
+            total=Sum('amount'),
+            count=Count('id'),
+        )
+        
+        with transaction.atomic():
+            user_ids = set(rollups.order_by().values_list('user_id', flat=True).distinct())
+            rollups.delete()
+            created = cls.objects.bulk_create(
+                (cls(**row) for row in rows.iterator()),
+                batch_size=1000,
+            )
+            user_ids.update(rollup.user_id for rollup in created)
+            user_ids = sorted(user_ids)
+            for start in range(0, len(user_ids), 1000):
+                UserProfile.bump_data_version(user_ids[start:start + 1000])
+        return len(created)
+
+
+class BudgetQuerySet(models.QuerySet):
+    def with_spending(self):
+        """Annotate total_spent, remaining, percentage_used and over_budget in SQL"""
+        money = DecimalField(max_digits=14, decimal_places=2)
+        spent = MonthlyCategorySpend.objects.filter(
+            user=OuterRef('user'),
+            year=OuterRef('year'),
+            month=OuterRef('month'),
+        ).order_by().values('user').annotate(total=Sum('total')).values('total')
+        return self.annotate(
+            total_spent=Coalesce(Subquery(spent, output_field=money), Value(0), output_field=money),
+        ).annotate(
+            remaining=ExpressionWrapper(F('amount') - F('total_spent'), output_field=money),
+            # Divide as floats: SQLite stores whole decimals as integers and
+            # would truncate 1000 / 1500 to 0
+            percentage_used=Case(
+                When(amount=0, then=Value(0)),
+                default=Round(Cast(
+                    Least(Value(100.0), Cast('total_spent', FloatField()) * 100 / Cast('amount', FloatField())),
+                    money,
+                ), 2),
+                output_field=money,
+            ),
+            over_budget=ExpressionWrapper(Q(total_spent__gt=F('amount')), output_field=BooleanField()),
+        )
 
 
 class Budget(models.Model):
@@ -51,6 +183,8 @@ class Budget(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = BudgetQuerySet.as_manager()
+    
     class Meta:
         unique_together = ['user', 'month', 'year']
         ordering = ['-year', '-month']
@@ -62,26 +196,31 @@ class Budget(models.Model):
         return f"{self.user.username} - {self.month}/{self.year}: ${self.amount}"
     
     def get_total_expenses(self):
-        """Calculate total expenses for this budget period"""
-        from django.db.models import Sum
-        total = self.user.expenses.filter(
-            date__year=self.year,
-            date__month=self.month
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-        return total
+        """Calculate total expenses for this budget period (cached in total_spent)"""
+        if getattr(self, 'total_spent', None) is None:
+            self.total_spent = self.user.expenses.filter(
+                **month_range_filter(self.year, self.month)
+            ).aggregate(Sum('amount'))['amount__sum'] or 0
+        return self.total_spent
     
     def get_remaining(self):
         """Calculate remaining budget"""
+        if getattr(self, 'remaining', None) is not None:
+            return self.remaining
         return self.amount - self.get_total_expenses()
     
     def get_percentage_used(self):
         """Calculate percentage of budget used"""
+        if getattr(self, 'percentage_used', None) is not None:
+            return self.percentage_used
         if self.amount == 0:
             return 0
         return min(100, (self.get_total_expenses() / self.amount) * 100)
     
     def is_over_budget(self):
         """Check if user has exceeded budget"""
+        if getattr(self, 'over_budget', None) is not None:
+            return self.over_budget
         return self.get_total_expenses() > self.amount
 
 
@@ -146,6 +285,8 @@ class Article(models.Model):
     image_url = models.URLField(blank=True, help_text="Optional image URL")
     is_featured = models.BooleanField(default=False)
     view_count = models.IntegerField(default=0)
+    url_hash = models.CharField(max_length=64, null=True, blank=True, unique=True, editable=False, help_text="SHA-256 of the full source URL (news only; used to deduplicate ingestion)")
+    published_at = models.DateTimeField(null=True, blank=True, help_text="Publication time reported by the news source")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -155,6 +296,7 @@ class Article(models.Model):
             models.Index(fields=['category', '-created_at']),
             models.Index(fields=['is_featured', '-created_at']),
             models.Index(fields=['article_type', '-created_at']),
+            models.Index(fields=['article_type', '-published_at']),
             models.Index(fields=['user', '-created_at']),
         ]
     
@@ -162,9 +304,67 @@ class Article(models.Model):
         return self.title
     
     def increment_view_count(self):
-        """Increment view count"""
-        self.view_count += 1
-        self.save(update_fields=['view_count'])
+        """Count a view (buffered; written to view_count in batches)"""
+        from .counters import record_article_view
+        record_article_view(self.pk)
+
+
+class NewsIngestGap(models.Model):
+    """Publication window that an interrupted news ingestion run didn't finish fetching"""
+    published_after = models.DateTimeField(help_text="Newest stored news item when the interrupted run started")
+    published_before = models.DateTimeField(help_text="Oldest item fetched so far; older items in the window are still missing")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['published_before']
+    
+    def __str__(self):
+        return f"News from {self.published_after:%Y-%m-%d %H:%M} to {self.published_before:%Y-%m-%d %H:%M}"
+
+
+# Currency used for each supported signup country
+COUNTRY_CURRENCY_MAP = {
+    'US': {'code': 'USD', 'symbol': '$'},
+    'IN': {'code': 'INR', 'symbol': '₹'},
+    'GB': {'code': 'GBP', 'symbol': '£'},
+    'CA': {'code': 'CAD', 'symbol': 'C$'},
+    'AU': {'code': 'AUD', 'symbol': 'A$'},
+    'DE': {'code': 'EUR', 'symbol': '€'},
+    'FR': {'code': 'EUR', 'symbol': '€'},
+    'IT': {'code': 'EUR', 'symbol': '€'},
+    'ES': {'code': 'EUR', 'symbol': '€'},
+    'NL': {'code': 'EUR', 'symbol': '€'},
+    'BE': {'code': 'EUR', 'symbol': '€'},
+    'AT': {'code': 'EUR', 'symbol': '€'},
+    'PT': {'code': 'EUR', 'symbol': '€'},
+    'IE': {'code': 'EUR', 'symbol': '€'},
+    'FI': {'code': 'EUR', 'symbol': '€'},
+    'GR': {'code': 'EUR', 'symbol': '€'},
+    'JP': {'code': 'JPY', 'symbol': '¥'},
+    'CN': {'code': 'CNY', 'symbol': '¥'},
+    'KR': {'code': 'KRW', 'symbol': '₩'},
+    'SG': {'code': 'SGD', 'symbol': 'S$'},
+    'MY': {'code': 'MYR', 'symbol': 'RM'},
+    'TH': {'code': 'THB', 'symbol': '฿'},
+    'ID': {'code': 'IDR', 'symbol': 'Rp'},
+    'PH': {'code': 'PHP', 'symbol': '₱'},
+    'VN': {'code': 'VND', 'symbol': '₫'},
+    'BR': {'code': 'BRL', 'symbol': 'R$'},
+    'MX': {'code': 'MXN', 'symbol': '$'},
+    'AR': {'code': 'ARS', 'symbol': '$'},
+    'ZA': {'code': 'ZAR', 'symbol': 'R'},
+    'EG': {'code': 'EGP', 'symbol': 'E£'},
+    'AE': {'code': 'AED', 'symbol': 'د.إ'},
+    'SA': {'code': 'SAR', 'symbol': '﷼'},
+    'NZ': {'code': 'NZD', 'symbol': 'NZ$'},
+    'CH': {'code': 'CHF', 'symbol': 'CHF'},
+    'SE': {'code': 'SEK', 'symbol': 'kr'},
+    'NO': {'code': 'NOK', 'symbol': 'kr'},
+    'DK': {'code': 'DKK', 'symbol': 'kr'},
+    'PL': {'code': 'PLN', 'symbol': 'zł'},
+    'RU': {'code': 'RUB', 'symbol': '₽'},
+    'TR': {'code': 'TRY', 'symbol': '₺'},
+}
 
 
 class UserProfile(models.Model):
@@ -173,6 +373,10 @@ class UserProfile(models.Model):
     country = models.CharField(max_length=100, default='US', help_text="Country code (e.g., US, IN, GB)")
     currency_code = models.CharField(max_length=3, default='USD', help_text="ISO 4217 currency code (e.g., USD, INR, GBP)")
     currency_symbol = models.CharField(max_length=10, default='$', help_text="Currency symbol (e.g., $, ₹, £)")
+    data_version = models.PositiveBigIntegerField(
+        default=0, editable=False,
+        help_text="Bumped whenever the user's expenses, budgets or goals change; keys their cached figures"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -183,57 +387,120 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.currency_code}"
     
+    def save(self, *args, **kwargs):
+        # data_version only changes through bump_data_version(); writing back
+        # the loaded value could undo a bump made since
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [field.name for field in self._meta.concrete_fields if not field.primary_key]
+            kwargs['update_fields'] = [name for name in update_fields if name != 'data_version']
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def bump_data_version(cls, user_ids):
+        """Invalidate every cached figure for these users"""
+        user_ids = set(user_ids)
+        bumped = cls.objects.filter(user_id__in=user_ids).update(data_version=F('data_version') + 1)
+        if bumped < len(user_ids):
+            # Users without a profile yet read as version 0
+            existing = cls.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True)
+            cls.objects.bulk_create(
+                [cls(user_id=user_id, data_version=1) for user_id in user_ids - set(existing)],
+                ignore_conflicts=True,
+            )
+    
     @staticmethod
     def get_currency_for_country(country_code):
         """Get currency information for a country"""
-        country_currency_map = {
-            'US': {'code': 'USD', 'symbol': '$'},
-            'IN': {'code': 'INR', 'symbol': '₹'},
-            'GB': {'code': 'GBP', 'symbol': '£'},
-            'CA': {'code': 'CAD', 'symbol': 'C$'},
-            'AU': {'code': 'AUD', 'symbol': 'A$'},
-            'DE': {'code': 'EUR', 'symbol': '€'},
-            'FR': {'code': 'EUR', 'symbol': '€'},
-            'IT': {'code': 'EUR', 'symbol': '€'},
-            'ES': {'code': 'EUR', 'symbol': '€'},
-            'NL': {'code': 'EUR', 'symbol': '€'},
-            'BE': {'code': 'EUR', 'symbol': '€'},
-            'AT': {'code': 'EUR', 'symbol': '€'},
-            'PT': {'code': 'EUR', 'symbol': '€'},
-            'IE': {'code': 'EUR', 'symbol': '€'},
-            'FI': {'code': 'EUR', 'symbol': '€'},
-            'GR': {'code': 'EUR', 'symbol': '€'},
-            'JP': {'code': 'JPY', 'symbol': '¥'},
-            'CN': {'code': 'CNY', 'symbol': '¥'},
-            'KR': {'code': 'KRW', 'symbol': '₩'},
-            'SG': {'code': 'SGD', 'symbol': 'S$'},
-            'MY': {'code': 'MYR', 'symbol': 'RM'},
-            'TH': {'code': 'THB', 'symbol': '฿'},
-            'ID': {'code': 'IDR', 'symbol': 'Rp'},
-            'PH': {'code': 'PHP', 'symbol': '₱'},
-            'VN': {'code': 'VND', 'symbol': '₫'},
-            'BR': {'code': 'BRL', 'symbol': 'R$'},
-            'MX': {'code': 'MXN', 'symbol': '$'},
-            'AR': {'code': 'ARS', 'symbol': '$'},
-            'ZA': {'code': 'ZAR', 'symbol': 'R'},
-            'EG': {'code': 'EGP', 'symbol': 'E£'},
-            'AE': {'code': 'AED', 'symbol': 'د.إ'},
-            'SA': {'code': 'SAR', 'symbol': '﷼'},
-            'NZ': {'code': 'NZD', 'symbol': 'NZ$'},
-            'CH': {'code': 'CHF', 'symbol': 'CHF'},
-            'SE': {'code': 'SEK', 'symbol': 'kr'},
-            'NO': {'code': 'NOK', 'symbol': 'kr'},
-            'DK': {'code': 'DKK', 'symbol': 'kr'},
-            'PL': {'code': 'PLN', 'symbol': 'zł'},
-            'RU': {'code': 'RUB', 'symbol': '₽'},
-            'TR': {'code': 'TRY', 'symbol': '₺'},
-        }
-        
         country_code = country_code.upper()
-        currency_info = country_currency_map.get(country_code, {'code': 'USD', 'symbol': '$'})
+        currency_info = COUNTRY_CURRENCY_MAP.get(country_code, {'code': 'USD', 'symbol': '$'})
         return currency_info
 
 
+def get_export_storage():
+    """Database storage for export artifacts, shared by the web and worker processes"""
+    from .storage import DatabaseExportStorage
+    return DatabaseExportStorage()
+
+
+class ExportJob(models.Model):
+    """Background CSV/PDF export, claimed and run by the run_export_worker command"""
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('pdf', 'PDF'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='export_jobs')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    filters = models.JSONField(default=dict, blank=True, help_text="ExpenseFilterForm parameters")
+    fingerprint = models.CharField(max_length=64, help_text="Hash of format, filters, currency and dataset state")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    progress = models.IntegerField(default=0, validators=[MinValueValidator(0), MaxValueValidator(100)])
+    total_rows = models.IntegerField(default=0)
+    artifact = models.FileField(storage=get_export_storage, upload_to='%Y/%m/', blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Last sign of life from the worker running the job")
+    attempts = models.IntegerField(default=0, help_text="Times a worker has claimed the job")
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['user', 'fingerprint']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.format} export ({self.status})"
+    
+    @property
+    def filename(self):
+        return f"expenses_{self.user.username}_{self.created_at.strftime('%Y%m%d')}.{self.format}"
+    
+    def has_artifact(self):
+        """Check the finished file is still on disk"""
+        return bool(self.artifact) and self.artifact.storage.exists(self.artifact.name)
+
+
+class ExportArtifactChunk(models.Model):
+    """One piece of a stored export file (see finance_app.storage)"""
+    name = models.CharField(max_length=255)
+    index = models.IntegerField()
+    data = models.BinaryField()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'index'], name='unique_export_artifact_chunk'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} [{self.index}]"
+
+
+class GeneratedTips(models.Model):
+    """Latest AI tips for a user, valid while their spending fingerprint is unchanged"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='generated_tips')
+    fingerprint = models.CharField(max_length=16, help_text="Hash of the spending summary and currency the tips were generated from")
+    tips = models.JSONField(default=list)
+    generated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Generated Tips"
+        verbose_name_plural = "Generated Tips"
+
+    def __str__(self):
+        return f"{self.user.username} - tips from {self.generated_at:%Y-%m-%d %H:%M}"
+
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     """Create user profile when user is created"""
@@ -243,3 +510,80 @@ def create_user_profile(sender, instance, created, **kwargs):
             'currency_code': 'USD',
             'currency_symbol': '$'
         })
+
+
+@receiver(pre_save, sender=Expense)
+def remember_expense_rollup_bucket(sender, instance, raw=False, **kwargs):
+    """Load the stored bucket for expenses that were not fetched through from_db"""
+    if raw or instance.pk is None or hasattr(instance, '_rollup_bucket'):
+        return
+    stored = Expense.objects.filter(pk=instance.pk).only('user_id', 'category_id', 'date', 'amount').first()
+    instance._rollup_bucket = stored.get_rollup_bucket() if stored else None
+
+
+@receiver(post_save, sender=Expense)
+def update_spend_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    """Move the expense between monthly rollup buckets"""
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_rollup_bucket', None)
+    current = instance.get_rollup_bucket()
+    if previous == current:
+        return
+    if previous:
+        MonthlyCategorySpend.apply_delta(*previous[:4], -previous[4], -1)
+    MonthlyCategorySpend.apply_delta(*current[:4], current[4], 1)
+    instance._rollup_bucket = current
+
+
+def deleted_with_user(origin):
+    """Check whether a delete is cascading from the owning user's deletion"""
+    return isinstance(origin, User)
+
+
+@receiver(post_delete, sender=Expense)
+def update_spend_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    """Remove a deleted expense from its monthly rollup bucket"""
+    if deleted_with_user(origin):
+        # The user's rollups are deleted by the same cascade
+        return
+    bucket = getattr(instance, '_rollup_bucket', None) or instance.get_rollup_bucket()
+    MonthlyCategorySpend.apply_delta(*bucket[:4], -bucket[4], -1)
+
+
+@receiver(pre_delete, sender=Category)
+def fold_category_rollups(sender, instance, **kwargs):
+    """Move a deleted category's rollups to the uncategorized bucket (expenses are SET_NULL)"""
+    for rollup in MonthlyCategorySpend.objects.filter(category=instance):
+        MonthlyCategorySpend.apply_delta(
+            rollup.user_id, rollup.year, rollup.month, None, rollup.total, rollup.count
+        )
+    MonthlyCategorySpend.objects.filter(category=instance).delete()
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+@receiver(post_save, sender=Budget)
+@receiver(post_delete, sender=Budget)
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+def bump_user_data_version(sender, instance, origin=None, **kwargs):
+    """Invalidate the user's cached figures when an expense, budget or goal changes"""
+    if deleted_with_user(origin):
+        # The profile is gone, and bumping would recreate it for a deleted user
+        return
+    UserProfile.bump_data_version([instance.user_id])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_category_cache_version(sender, instance, **kwargs):
+    """Make every process reload its category cache"""
+    bump_category_version()
+
+
+@receiver(post_migrate)
+def restore_article_search_triggers(sender, using, **kwargs):
+    """Recreate the SQLite article search triggers when a table rebuild dropped them"""
+    if sender.label == 'finance_app':
+        restore_sqlite_search_triggers(connections[using])
@@ -0,0 +1,323 @@
+"""
+Financial news ingestion from NewsAPI
+
+Run out of band by the ingest_news management command, never inside a
+request. Each run asks only for items published since the newest stored
+one. Items are deduplicated on a hash of their full URL, which is unique
+in the database, and written with bulk_create(ignore_conflicts=True).
+
+Requests go through the outbound layer's NewsAPI circuit breaker, so a run
+stops at the first page once NewsAPI has failed repeatedly. If a later page
+fails (developer keys, for one, stop after 100 results) or more pages remain
+than a run may request, the pages already fetched are still stored and the
+unfetched part of the window is recorded as a NewsIngestGap. Later runs page
+back through it, ending each request at the oldest item fetched so far, until
+it is complete.
+"""
+import asyncio
+import hashlib
+import itertools
+import math
+import os
+from datetime import timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+from .cache_utils import filter_fingerprint
+from .models import Article, NewsIngestGap
+from .outbound import CircuitOpenError, get_session, newsapi_service
+
+NEWS_QUERY = 'finance OR financial OR economy OR stock market OR investing OR cryptocurrency'
+NEWS_PAGE_SIZE = 100
+NEWS_MAX_PAGES = 5
+NEWS_REQUEST_TIMEOUT = 10
+NEWS_CONTENT_MAX_LENGTH = 10000
+
+
+class NewsIngestError(Exception):
+    """NewsAPI could not be reached or returned an error"""
+
+
+def news_url_hash(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def newest_published_at():
+    """Publication time of the newest stored news item, or None"""
+    return Article.objects.filter(article_type='news').aggregate(
+        newest=Max('published_at')
+    )['newest']
+
+
+def news_request_params(api_key, page, since=None, until=None):
+    params = {
+        'q': NEWS_QUERY,
+        'language': 'en',
+        'sortBy': 'publishedAt',
+        'pageSize': NEWS_PAGE_SIZE,
+        'page': page,
+        'apiKey': api_key,
+    }
+    if since is not None:
+        params['from'] = since.isoformat(timespec='seconds')
+    if until is not None:
+        params['to'] = until.isoformat(timespec='seconds')
+    return params
+
+
+def check_news_response(status_code, data):
+    """The decoded NewsAPI payload, or NewsIngestError if it reports an error"""
+    if status_code != 200 or data.get('status') != 'ok':
+        message = data.get('message') or f'HTTP {status_code}'
+        raise NewsIngestError(f'NewsAPI returned an error: {message}')
+    return data
+
+
+def fetch_news_page(api_key, page, since=None, until=None, session=None):
+    """One page of NewsAPI results, newest first, limited to items published between ``since`` and ``until``"""
+    if not HAS_REQUESTS:
+        raise NewsIngestError('The requests package is not installed')
+
+    http = session or get_session()
+    params = news_request_params(api_key, page, since, until)
+
+    def get():
+        try:
+            response = http.get(settings.NEWS_API_URL, params=params, timeout=NEWS_REQUEST_TIMEOUT)
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise NewsIngestError(f'NewsAPI request failed: {e}') from e
+        return check_news_response(response.status_code, data)
+
+    try:
+        data = newsapi_service.call(filter_fingerprint(params), get)
+    except CircuitOpenError as e:
+        raise NewsIngestError(f'NewsAPI keeps failing; not calling it for now ({e})') from e
+    return data.get('articles', [])
+
+
+async def afetch_news_page(client, api_key, page, since=None, until=None):
+    """Async fetch_news_page() on an httpx.AsyncClient; returns the whole payload"""
+    params = news_request_params(api_key, page, since, until)
+
+    async def get():
+        try:
+            response = await client.get(settings.NEWS_API_URL, params=params)
+            data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise NewsIngestError(f'NewsAPI request failed: {e}') from e
+        return check_news_response(response.status_code, data)
+
+    try:
+        return await newsapi_service.acall(filter_fingerprint(params), get)
+    except CircuitOpenError as e:
+        raise NewsIngestError(f'NewsAPI keeps failing; not calling it for now ({e})') from e
+
+
+def article_from_news_item(item):
+    """Unsaved news Article for a NewsAPI item, or None if it's unusable"""
+    url = item.get('url') or ''
+    title = item.get('title') or ''
+    description = item.get('description') or ''
+    if not url or not title or not description:
+        return None
+
+    content = item.get('content') or description
+    if len(content) > NEWS_CONTENT_MAX_LENGTH:
+        content = content[:NEWS_CONTENT_MAX_LENGTH] + '...'
+
+    published_at = parse_datetime(item.get('publishedAt') or '')
+    if published_at is not None and timezone.is_naive(published_at):
+        published_at = timezone.make_aware(published_at, dt_timezone.utc)
+
+    return Article(
+        article_type='news',
+        url_hash=news_url_hash(url),
+        title=title[:300],
+        summary=description[:500],
+        content=content,
+        author=(item.get('author') or 'News Source')[:200],
+        source=url[:200],
+        image_url=(item.get('urlToImage') or '')[:200],
+        category='News',
+        published_at=published_at or timezone.now(),
+    )
+
+
+def collect_news_articles(items):
+    """Unsaved Articles for usable items, deduplicated by URL hash"""
+    articles = {}
+    for item in items:
+        article = article_from_news_item(item)
+        if article is not None:
+            articles.setdefault(article.url_hash, article)
+    return articles
+
+
+def store_news_window(items, since, until=None, fetched_through=None, gap=None):
+    """
+    Store a window's usable items and record the part of it still missing
+
+    ``fetched_through`` holds the items fetched without a break from the
+    newest end of the window; None means the whole window was fetched.
+    Returns (fetched, created).
+    """
+    articles = collect_news_articles(items)
+    already_stored = 0
+    with transaction.atomic():
+        if articles:
+            already_stored = Article.objects.filter(url_hash__in=list(articles)).count()
+            Article.objects.bulk_create(articles.values(), batch_size=500, ignore_conflicts=True)
+        if fetched_through is None:
+            if gap is not None:
+                gap.delete()
+        elif since is not None:
+            oldest = min(
+                (article.published_at for article in collect_news_articles(fetched_through).values()),
+                default=until,
+            )
+            if gap is not None:
+                gap.published_before = oldest
+                gap.save(update_fields=['published_before'])
+            elif oldest is not None:
+                NewsIngestGap.objects.create(published_after=since, published_before=oldest)
+    return len(articles), len(articles) - already_stored
+
+
+def news_windows():
+    """(since, until, gap) for new items, then for each window earlier runs left unfinished"""
+    windows = [(newest_published_at(), None, None)]
+    windows.extend((gap.published_after, gap.published_before, gap) for gap in NewsIngestGap.objects.all())
+    return windows
+
+
+def fetch_news_window(api_key, max_pages, since, until=None, session=None):
+    """
+    Pages of one publication window, newest first
+
+    Returns (items, fetched_through, error): ``fetched_through`` as
+    store_news_window() takes it, and the NewsIngestError that stopped paging
+    early (or None). A failure on the first page raises.
+    """
+    items = []
+    for page in range(1, max_pages + 1):
+        try:
+            results = fetch_news_page(api_key, page, since=since, until=until, session=session)
+        except NewsIngestError as e:
+            if page == 1:
+                raise
+            return items, items, e
+        items.extend(results)
+        if len(results) < NEWS_PAGE_SIZE:
+            return items, None, None
+    # More pages remain than a run may request
+    return items, items, None
+
+
+def ingest_news(api_key=None, max_pages=NEWS_MAX_PAGES, session=None):
+    """
+    Fetch news published since the newest stored item and store new ones
+
+    Windows that earlier runs didn't finish are then resumed. Returns
+    (fetched, created, error): the number of usable items received, the
+    number that weren't already stored, and the NewsIngestError that stopped
+    paging early (or None). A failure on the first page of new items raises.
+    """
+    api_key = api_key or os.getenv('NEWS_API_KEY', '')
+    if not api_key:
+        raise NewsIngestError('NEWS_API_KEY is not set')
+
+    fetched = created = 0
+    for since, until, gap in news_windows():
+        try:
+            items, fetched_through, error = fetch_news_window(api_key, max_pages, since, until, session=session)
+        except NewsIngestError as e:
+            if gap is None:
+                raise
+            error = e
+        else:
+            window_fetched, window_created = store_news_window(items, since, until, fetched_through, gap)
+            fetched += window_fetched
+            created += window_created
+        if error is not None:
+            # Leave the remaining windows for a run where NewsAPI is answering
+            return fetched, created, error
+    return fetched, created, None
+
+
+async def afetch_news_window(client, api_key, max_pages, since, until=None):
+    """
+    Async fetch_news_window()
+
+    The first page reports how many results there are; the remaining pages
+    are then fetched concurrently. Items from pages after a failed one are
+    kept, but the window is only fetched through the last unbroken page.
+    """
+    first = await afetch_news_page(client, api_key, 1, since=since, until=until)
+    pages = [first.get('articles', [])]
+    total_pages = math.ceil(first.get('totalResults', 0) / NEWS_PAGE_SIZE)
+    error = None
+    if total_pages > 1:
+        rest = await asyncio.gather(*(
+            afetch_news_page(client, api_key, page, since=since, until=until)
+            for page in range(2, min(max_pages, total_pages) + 1)
+        ), return_exceptions=True)
+        for data in rest:
+            if isinstance(data, NewsIngestError):
+                error = error or data
+                pages.append(None)
+            elif isinstance(data, BaseException):
+                raise data
+            else:
+                pages.append(data.get('articles', []))
+
+    items = [item for page in pages if page for item in page]
+    if error is None and total_pages <= max_pages:
+        return items, None, None
+    unbroken = itertools.takewhile(lambda page: page is not None, pages)
+    return items, [item for page in unbroken for item in page], error
+
+
+async def aingest_news(api_key=None, max_pages=NEWS_MAX_PAGES):
+    """Async ingest_news(); the pages of each window are fetched concurrently"""
+    if not HAS_HTTPX:
+        raise NewsIngestError('The httpx package is not installed')
+    api_key = api_key or os.getenv('NEWS_API_KEY', '')
+    if not api_key:
+        raise NewsIngestError('NEWS_API_KEY is not set')
+
+    fetched = created = 0
+    async with httpx.AsyncClient(timeout=NEWS_REQUEST_TIMEOUT) as client:
+        for since, until, gap in await sync_to_async(news_windows)():
+            try:
+                items, fetched_through, error = await afetch_news_window(client, api_key, max_pages, since, until)
+            except NewsIngestError as e:
+                if gap is None:
+                    raise
+                error = e
+            else:
+                window_fetched, window_created = await sync_to_async(store_news_window)(
+                    items, since, until, fetched_through, gap
+                )
+                fetched += window_fetched
+                created += window_created
+            if error is not None:
+                return fetched, created, error
+    return fetched, created, None
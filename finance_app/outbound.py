@@ -0,0 +1,302 @@
+"""
+Shared layer for calls to external APIs (OpenAI, NewsAPI)
+
+Each upstream gets an OutboundService with:
+- Single-flight coalescing: concurrent calls with the same key share one
+  upstream request and its result (or error).
+- A circuit breaker: after FAILURE_THRESHOLD consecutive failures, calls
+  fail immediately with CircuitOpenError for RESET_TIMEOUT seconds. Callers
+  fall back straight away instead of waiting out the timeout. One trial
+  call is then let through. If it succeeds the circuit closes; if it fails
+  the circuit opens again.
+- Counters and the breaker state, served by the outbound metrics view.
+
+State is per process. Sync callers share a pooled requests.Session, so
+connections are kept alive between calls. Under ASGI, async callers share
+one httpx.AsyncClient per event loop in the same way. Async views under
+WSGI run on a fresh event loop per request, so there each use gets its own
+client, closed when it's done.
+"""
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30
+POOL_MAXSIZE = 20
+
+
+class CircuitOpenError(Exception):
+    """The upstream has been failing; the call was not attempted"""
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go upstream now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            raise CircuitOpenError('Upstream is unavailable; skipping the call')
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def record_abandoned(self):
+        """The call was cancelled before it finished; let another one try"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class OutboundService:
+    """Coalescing, circuit breaking and metrics for one upstream API"""
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.name = name
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.counts = {
+            'calls': 0,
+            'upstream_calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'short_circuited': 0,
+            'coalesced': 0,
+        }
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._async_flights = {}
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def before_call(self):
+        """Count a call and check the breaker (for calls that can't be coalesced)"""
+        self._count('calls')
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self._count('short_circuited')
+            raise
+        self._count('upstream_calls')
+
+    def record_success(self):
+        self._count('successes')
+        self.breaker.record_success()
+
+    def record_failure(self):
+        self._count('failures')
+        self.breaker.record_failure()
+
+    def call(self, key, fn):
+        """
+        fn() through the breaker; concurrent calls with the same key share one
+        invocation. Any exception from fn counts as an upstream failure.
+        """
+        with self._lock:
+            self.counts['calls'] += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.counts['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self._count('short_circuited')
+                raise
+            self._count('upstream_calls')
+            try:
+                flight.result = fn()
+            except Exception:
+                self.record_failure()
+                raise
+            self.record_success()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def acall(self, key, coro_fn):
+        """Async call(); coro_fn() returns the awaitable to share"""
+        loop = asyncio.get_running_loop()
+        # Futures belong to one event loop, so only coalesce within a loop
+        flight_key = (id(loop), key)
+        self._count('calls')
+        future = self._async_flights.get(flight_key)
+        if future is not None:
+            self._count('coalesced')
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        self._async_flights[flight_key] = future
+        try:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self._count('short_circuited')
+                raise
+            self._count('upstream_calls')
+            try:
+                result = await coro_fn()
+            except Exception:
+                self.record_failure()
+                raise
+            except BaseException:
+                self.breaker.record_abandoned()
+                raise
+            self.record_success()
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved so it isn't logged when nobody
+            # else was waiting for it
+            future.exception()
+            raise
+        finally:
+            del self._async_flights[flight_key]
+            if not future.done():
+                # The leader was cancelled; let followers see that too
+                future.cancel()
+
+    def metrics(self):
+        breaker = self.breaker
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            'state': breaker.state,
+            'consecutive_failures': breaker.consecutive_failures,
+            'times_opened': breaker.times_opened,
+            'seconds_since_opened': (
+                round(time.monotonic() - breaker.opened_at, 1) if breaker.opened_at else None
+            ),
+            **counts,
+        }
+
+
+openai_service = OutboundService('openai')
+newsapi_service = OutboundService('newsapi')
+
+SERVICES = {service.name: service for service in (openai_service, newsapi_service)}
+
+
+def outbound_metrics():
+    """Breaker state and counters for every upstream, keyed by name"""
+    return {name: service.metrics() for name, service in SERVICES.items()}
+
+
+@lru_cache(maxsize=None)
+def get_session():
+    """Process-wide requests.Session with a keep-alive connection pool"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(SERVICES), pool_maxsize=POOL_MAXSIZE)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+@lru_cache(maxsize=None)
+def http_ssl_context():
+    # Building an SSL context loads the CA bundle, ~30 ms of blocking work that
+    # would stall the event loop if every AsyncClient did it
+    return httpx.create_ssl_context()
+
+
+_async_clients = weakref.WeakKeyDictionary()
+_share_async_clients = False
+
+
+def share_async_clients():
+    """Keep one AsyncClient open per event loop (called by the ASGI entry point)"""
+    global _share_async_clients
+    _share_async_clients = True
+
+
+def _new_async_client():
+    return httpx.AsyncClient(
+        verify=http_ssl_context(),
+        limits=httpx.Limits(max_keepalive_connections=POOL_MAXSIZE),
+    )
+
+
+@asynccontextmanager
+async def async_client():
+    """httpx.AsyncClient for the current event loop: shared under ASGI, closed on exit otherwise"""
+    if not _share_async_clients:
+        async with _new_async_client() as client:
+            yield client
+        return
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = _new_async_client()
+    yield client
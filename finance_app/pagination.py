@@ -0,0 +1,50 @@
+"""
+Keyset (seek) pagination for expense lists
+
+Pages are ordered by (date, created_at, id) descending and the cursor holds
+the last row's key, so fetching any page is an index range read of
+page_size rows instead of an OFFSET scan over every earlier row.
+"""
+import base64
+from datetime import date, datetime
+
+from django.db.models import Q
+
+EXPENSE_PAGE_SIZE = 50
+
+
+def encode_cursor(expense):
+    """Opaque cursor pointing just after expense"""
+    raw = f"{expense.date.isoformat()}|{expense.created_at.isoformat()}|{expense.pk}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Return (date, created_at, id) for a cursor, or None if it is missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        date_part, created_part, pk_part = raw.split('|')
+        return date.fromisoformat(date_part), datetime.fromisoformat(created_part), int(pk_part)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def paginate_expenses(expenses, cursor=None, page_size=EXPENSE_PAGE_SIZE):
+    """Return (page of expenses, next cursor or None) for an Expense queryset"""
+    expenses = expenses.order_by('-date', '-created_at', '-id')
+    position = decode_cursor(cursor)
+    if position:
+        last_date, last_created, last_id = position
+        expenses = expenses.filter(
+            Q(date__lt=last_date)
+            | Q(date=last_date, created_at__lt=last_created)
+            | Q(date=last_date, created_at=last_created, id__lt=last_id)
+        )
+    # Fetch one extra row to know whether another page exists
+    rows = list(expenses[:page_size + 1])
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
@@ -0,0 +1,212 @@
+"""
+Full-text search over articles
+
+On PostgreSQL, articles carry a weighted ``search_vector`` tsvector column
+generated from title, summary and content, with a GIN index on it. On SQLite,
+an FTS5 table is kept in sync with the article table by triggers. Migration
+0007 creates both outside the ORM, so Article has no search field of its own;
+the SQLite triggers are recreated after any migration that drops them.
+Other backends, or an SQLite build without FTS5, fall back to unranked
+icontains matching.
+"""
+import re
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import F, FloatField, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+SEARCH_RESULT_LIMIT = 60
+SNIPPET_WORDS = 24
+
+# Control characters mark highlighted terms in raw snippets. They can't appear
+# in article text, so the snippet can be escaped before they become <mark> tags
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+ARTICLE_TABLE = 'finance_app_article'
+FTS_TABLE = 'finance_app_article_fts'
+
+# Same statements as migration 0007, for restore_sqlite_search_triggers().
+# Only changes to the indexed columns touch the FTS table, so view count
+# updates don't pay for reindexing
+SQLITE_TRIGGER_SQL = {
+    f'{FTS_TABLE}_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {ARTICLE_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, summary, content)
+            VALUES (new.id, new.title, new.summary, new.content);
+        END
+    """,
+    f'{FTS_TABLE}_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {ARTICLE_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, summary, content)
+            VALUES ('delete', old.id, old.title, old.summary, old.content);
+        END
+    """,
+    f'{FTS_TABLE}_au': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+        AFTER UPDATE OF title, summary, content ON {ARTICLE_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, summary, content)
+            VALUES ('delete', old.id, old.title, old.summary, old.content);
+            INSERT INTO {FTS_TABLE}(rowid, title, summary, content)
+            VALUES (new.id, new.title, new.summary, new.content);
+        END
+    """,
+}
+
+_backend_cache = {}
+
+
+def restore_sqlite_search_triggers(connection):
+    """
+    Recreate missing SQLite sync triggers and reindex; True if any were missing
+
+    Any migration that rebuilds the article table on SQLite drops its
+    triggers, so this runs after every migrate (see models.py).
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    names = [FTS_TABLE, *SQLITE_TRIGGER_SQL]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(names))})", names
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE not in existing or existing.issuperset(SQLITE_TRIGGER_SQL):
+            return False
+        for sql in SQLITE_TRIGGER_SQL.values():
+            cursor.execute(sql)
+        # Rows written while the triggers were gone aren't indexed
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def search_backend(using='default'):
+    """'postgresql', 'sqlite' or None when no full-text index is available"""
+    connection = connections[using]
+    key = (using, connection.settings_dict['NAME'])
+    if key not in _backend_cache:
+        backend = None
+        if connection.vendor == 'postgresql':
+            backend = 'postgresql'
+        elif connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+                )
+                if cursor.fetchone() is not None:
+                    backend = 'sqlite'
+        _backend_cache[key] = backend
+    return _backend_cache[key]
+
+
+def fts5_query(text):
+    """
+    Turn free text into an FTS5 MATCH expression
+
+    Every word is quoted so FTS5 operators in user input are matched
+    literally, and the last word also matches as a prefix.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def highlight_snippet(snippet):
+    """Escape a raw snippet and wrap matched terms in <mark> tags"""
+    html = escape(snippet)
+    return mark_safe(html.replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'))
+
+
+def _postgres_search(queryset, text):
+    from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVectorField
+
+    query = SearchQuery(text, config='english', search_type='websearch')
+    # The generated column isn't a model field, so it is aliased rather than
+    # selected
+    return queryset.alias(
+        search_vector=RawSQL(f'{ARTICLE_TABLE}.search_vector', [], output_field=SearchVectorField()),
+    ).filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query),
+        search_snippet=SearchHeadline(
+            'content', query, config='english',
+            start_sel=MARK_START, stop_sel=MARK_END,
+            max_words=SNIPPET_WORDS, min_words=SNIPPET_WORDS // 2, max_fragments=1,
+        ),
+    ).order_by('-search_rank', '-created_at')
+
+
+def _sqlite_search(queryset, text, limit):
+    match = fts5_query(text)
+    if not match:
+        return []
+    try:
+        candidates, params = queryset.order_by().values('id').query.sql_with_params()
+    except EmptyResultSet:
+        return []
+
+    # Rank inside FTS5 so bm25() runs once per match, then build snippets for
+    # the top rows only. The unary + keeps SQLite from pushing the rowid IN
+    # into FTS5, which would rerun the MATCH once per candidate article.
+    # bm25() is lower-is-better; negate it so both backends rank descending.
+    # Weights favour title over summary over body text
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT ranked.rowid, ranked.search_rank,
+                   snippet({FTS_TABLE}, -1, %s, %s, '…', {SNIPPET_WORDS})
+            FROM (
+                SELECT rowid, -bm25({FTS_TABLE}, 10.0, 4.0, 1.0) AS search_rank
+                FROM {FTS_TABLE}
+                WHERE {FTS_TABLE} MATCH %s AND +rowid IN ({candidates})
+                ORDER BY search_rank DESC, rowid DESC
+                LIMIT %s
+            ) AS ranked
+            JOIN {FTS_TABLE} ON {FTS_TABLE}.rowid = ranked.rowid
+            WHERE {FTS_TABLE} MATCH %s
+            ORDER BY ranked.search_rank DESC, ranked.rowid DESC
+            """,
+            [MARK_START, MARK_END, match, *params, limit, match],
+        )
+        rows = cursor.fetchall()
+
+    found = queryset.in_bulk([pk for pk, _, _ in rows])
+    articles = []
+    for pk, rank, snippet in rows:
+        article = found[pk]
+        article.search_rank = rank
+        article.search_snippet = snippet
+        articles.append(article)
+    return articles
+
+
+def search_articles(queryset, text, limit=SEARCH_RESULT_LIMIT):
+    """
+    Best matches for ``text`` within an Article queryset, most relevant first
+
+    Returns a list of articles with ``search_rank`` and ``search_snippet``
+    set; the snippet is an HTML-safe excerpt with matched terms highlighted,
+    or empty when the backend has no full-text index.
+    """
+    backend = search_backend(queryset.db)
+    if backend == 'sqlite':
+        articles = _sqlite_search(queryset, text, limit)
+    elif backend == 'postgresql':
+        articles = list(_postgres_search(queryset, text)[:limit])
+    else:
+        results = queryset.filter(
+            Q(title__icontains=text) | Q(summary__icontains=text) | Q(content__icontains=text)
+        ).annotate(
+            search_rank=Value(0.0, output_field=FloatField()),
+            search_snippet=Value('', output_field=TextField()),
+        )
+        articles = list(results[:limit])
+
+    for article in articles:
+        article.search_snippet = highlight_snippet(article.search_snippet or '')
+    return articles
@@ -0,0 +1,109 @@
+"""
+Monthly spending figures shared by the dashboard, reports and AI tips
+"""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .cache_utils import user_cache_key
+from .date_utils import last_n_months, shift_month
+from .models import Budget, MonthlyCategorySpend
+
+SNAPSHOT_MONTHS = 6
+SNAPSHOT_CACHE_SECONDS = 300
+
+
+class SpendingSnapshot:
+    """Per-month, per-category spending totals and this month's budget"""
+
+    def __init__(self, months, today, rows, budget):
+        # (year, month) pairs, oldest first
+        self.months = months
+        self.today = today
+        # year, month, category__name, category__icon, total, count; largest first
+        self.rows = rows
+        # Annotated by Budget.objects.with_spending(), or None
+        self.budget = budget
+
+    @classmethod
+    def build(cls, user, months=SNAPSHOT_MONTHS, today=None):
+        today = today or timezone.localdate()
+        window = last_n_months(months, today)
+        start_year, start_month = window[0]
+        rows = list(MonthlyCategorySpend.objects.filter(user=user).filter(
+            Q(year__gt=start_year) | Q(year=start_year, month__gte=start_month)
+        ).values('year', 'month', 'category__name', 'category__icon').annotate(
+            total=Sum('total'),
+            count=Sum('count')
+        ).order_by('-total'))
+        budget = Budget.objects.with_spending().filter(
+            user=user, month=today.month, year=today.year
+        ).first()
+        return cls(window, today, rows, budget)
+
+    @property
+    def current_month(self):
+        return (self.today.year, self.today.month)
+
+    @property
+    def last_month(self):
+        return shift_month(self.today.year, self.today.month, -1)
+
+    def month_totals(self):
+        """{(year, month): total} for every month in the window, including empty ones"""
+        totals = dict.fromkeys(self.months, Decimal('0'))
+        for row in self.rows:
+            key = (row['year'], row['month'])
+            if key in totals:
+                totals[key] += row['total']
+        return totals
+
+    def categories(self, year, month):
+        """Category rows for one month, largest first"""
+        return [row for row in self.rows if (row['year'], row['month']) == (year, month)]
+
+    def category_totals(self, months=None):
+        """Totals per (category name, icon) over the last ``months`` months, largest first"""
+        window = set(self.months[-months:] if months else self.months)
+        totals = {}
+        for row in self.rows:
+            if (row['year'], row['month']) in window:
+                key = (row['category__name'], row['category__icon'])
+                totals[key] = totals.get(key, Decimal('0')) + row['total']
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    @property
+    def current_categories(self):
+        return self.categories(*self.current_month)
+
+    @property
+    def current_total(self):
+        return sum((row['total'] for row in self.current_categories), Decimal('0'))
+
+    @property
+    def current_count(self):
+        return sum(row['count'] for row in self.current_categories)
+
+    @property
+    def last_month_total(self):
+        return sum((row['total'] for row in self.categories(*self.last_month)), Decimal('0'))
+
+
+def get_spending_snapshot(user, months=SNAPSHOT_MONTHS):
+    """The user's snapshot for the last ``months`` months (memoized, then cached)"""
+    months = max(months, SNAPSHOT_MONTHS)
+    today = timezone.localdate()
+    key = user_cache_key(user, 'spending_snapshot', months, today.isoformat())
+    memo = getattr(user, '_spending_snapshots', None)
+    if memo is None:
+        memo = user._spending_snapshots = {}
+    snapshot = memo.get(key)
+    if snapshot is None:
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = SpendingSnapshot.build(user, months, today)
+            cache.set(key, snapshot, SNAPSHOT_CACHE_SECONDS)
+        memo[key] = snapshot
+    return snapshot
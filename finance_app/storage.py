@@ -0,0 +1,82 @@
+"""
+Database file storage for export artifacts
+
+The export worker runs as its own process (often its own service, with its
+own disk), so finished files are kept in the database, split into
+ExportArtifactChunk rows, where every web process can stream them back.
+"""
+import io
+
+from django.core.files import File
+from django.core.files.storage import Storage
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Length
+from django.utils.deconstruct import deconstructible
+
+# Bytes per stored chunk; reads and writes hold one chunk at a time
+ARTIFACT_CHUNK_BYTES = 1024 * 1024
+
+
+class ArtifactChunkReader(io.RawIOBase):
+    """Read-only file object that fetches a stored artifact one chunk at a time"""
+
+    def __init__(self, chunks, count):
+        super().__init__()
+        self._chunks = chunks
+        self._count = count
+        self._index = 0
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._buffer:
+            if self._index == self._count:
+                return 0
+            data = self._chunks.filter(index=self._index).values_list('data', flat=True).first()
+            if data is None:
+                return 0
+            self._buffer = bytes(data)
+            self._index += 1
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+@deconstructible
+class DatabaseExportStorage(Storage):
+    """Storage backend keeping each file as ordered ExportArtifactChunk rows"""
+
+    def _chunks(self, name):
+        from .models import ExportArtifactChunk
+        return ExportArtifactChunk.objects.filter(name=name)
+
+    def _save(self, name, content):
+        from .models import ExportArtifactChunk
+        with transaction.atomic():
+            for index, data in enumerate(content.chunks(ARTIFACT_CHUNK_BYTES)):
+                ExportArtifactChunk.objects.create(name=name, index=index, data=data)
+        return name
+
+    def _open(self, name, mode='rb'):
+        if 'w' in mode or 'a' in mode or '+' in mode:
+            raise ValueError('Export artifacts are read-only once saved')
+        chunks = self._chunks(name).order_by()
+        stored = chunks.aggregate(count=Count('id'), size=Sum(Length('data')))
+        if not stored['count']:
+            raise FileNotFoundError(name)
+        file = File(ArtifactChunkReader(chunks, stored['count']), name=name)
+        file.size = stored['size']
+        return file
+
+    def exists(self, name):
+        return self._chunks(name).exists()
+
+    def delete(self, name):
+        self._chunks(name).delete()
+
+    def size(self, name):
+        return self._chunks(name).aggregate(size=Sum(Length('data')))['size'] or 0
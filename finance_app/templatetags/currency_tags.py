@@ -2,7 +2,7 @@
 Template tags for currency formatting
 """
 from django import template
-from ..currency_utils import format_currency, get_user_currency
+from ..currency_utils import DEFAULT_CURRENCY, get_currency_formatter, get_user_currency
 
 register = template.Library()
 
@@ -13,33 +13,29 @@ def currency(value, user=None):
     if value is None:
         value = 0
     
-    currency_symbol = '$'  # Default fallback
+    currency_info = DEFAULT_CURRENCY  # Default fallback
     
-    # Try to get currency from user object
+    # Try to get currency from user object (resolved once per request and
+    # memoized on the user, so repeated calls don't query)
     if user:
         # Check if it's a User object
         if hasattr(user, 'is_authenticated'):
             if user.is_authenticated:
                 try:
                     currency_info = get_user_currency(user)
-                    currency_symbol = currency_info['symbol']
-                except Exception as e:
-                    # If profile doesn't exist, get_user_currency will create it
-                    try:
-                        currency_info = get_user_currency(user)
-                        currency_symbol = currency_info['symbol']
-                    except Exception:
-                        pass
+                except Exception:
+                    pass
         # Check if it's a request object
+        elif hasattr(user, 'currency'):
+            currency_info = user.currency
         elif hasattr(user, 'user'):
             if hasattr(user.user, 'is_authenticated') and user.user.is_authenticated:
                 try:
                     currency_info = get_user_currency(user.user)
-                    currency_symbol = currency_info['symbol']
                 except Exception:
                     pass
     
-    return format_currency(value, currency_symbol)
+    return get_currency_formatter(currency_info['code'], currency_info['symbol']).format(value)
 
 
 @register.filter
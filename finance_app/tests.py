@@ -0,0 +1,1221 @@
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+import timeit
+import tracemalloc
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from statistics import median
+from io import BytesIO, StringIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlparse
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import OperationalError, connection, transaction
+from django.db.models import Q
+from django.test import AsyncClient, Client, SimpleTestCase, TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import counters
+from .cache_utils import get_category_version
+from .category_cache import get_categories
+from .currency_utils import get_currency_formatter
+from .date_utils import last_n_months, month_range, month_range_filter, shift_month
+from .exports import (
+    EXPORT_LEASE_SECONDS, EXPORT_MAX_ATTEMPTS, EXPORT_RETENTION, PDF_TARGET_PAGES_PER_SECOND,
+    purge_old_exports, run_export_job, write_expense_pdf,
+)
+from .forms import CachedCategoryChoiceField
+from .insights import SpendingHistory, budget_tip
+from .management.commands.run_export_worker import requeue_stale_jobs
+from .models import (
+    Article, Budget, Category, Expense, ExportArtifactChunk, ExportJob, GeneratedTips, Goal, MonthlyCategorySpend,
+    NewsIngestGap, UserProfile,
+)
+from .news import NewsIngestError, aingest_news, ingest_news
+from .outbound import CircuitBreaker, async_client, newsapi_service, openai_service
+from .search import FTS_TABLE, SEARCH_RESULT_LIMIT, search_articles
+from .urls import urlpatterns
+
+
+class DashboardQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('dashboard', password='not-used')
+        categories = [Category.objects.create(name=name) for name in ('Food', 'Rent', 'Travel')]
+        today = timezone.localdate()
+        for n, (year, month) in enumerate(last_n_months(6, today)):
+            for category in categories + [None]:
+                Expense.objects.create(
+                    user=cls.user, category=category, title=f'{month}/{year}',
+                    amount=Decimal(10 + n), date=date(year, month, 1),
+                )
+        Expense.objects.create(user=cls.user, title='Upcoming', amount=Decimal('50'), date=today + timedelta(days=3))
+        Budget.objects.create(user=cls.user, month=today.month, year=today.year, amount=Decimal('500'))
+
+    def setUp(self):
+        cache.clear()
+        # Categories are cached per process, as in a running worker
+        get_categories()
+        self.client.force_login(self.user)
+
+    def test_query_budget(self):
+        # Session, user and profile, the month x category rollup, the budget
+        # with its spending, recent expenses and upcoming bills; nothing per
+        # month, category or row
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['recent_expenses']), 5)
+        self.assertEqual(len(response.context['upcoming_expenses']), 1)
+
+    def test_cached_dashboard_only_loads_the_session_and_user(self):
+        self.client.get(reverse('dashboard'))
+        with self.assertNumQueries(2):
+            self.client.get(reverse('dashboard'))
+
+    def test_category_changes_reach_the_cached_dashboard(self):
+        def category_names():
+            response = self.client.get(reverse('dashboard'))
+            return {row['category__name'] for row in response.context['category_data']}
+
+        self.assertIn('Food', category_names())
+        food = Category.objects.get(name='Food')
+        food.name = 'Groceries'
+        food.save()
+        self.assertIn('Groceries', category_names())
+
+        Category.objects.get(name='Rent').delete()
+        self.assertNotIn('Rent', category_names())
+
+
+class MonthlyRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('rollup', password='not-used')
+        cls.food = Category.objects.create(name='Food')
+        cls.rent = Category.objects.create(name='Rent')
+
+    def buckets(self):
+        return {
+            (rollup.year, rollup.month, rollup.category_id): (rollup.total, rollup.count)
+            for rollup in MonthlyCategorySpend.objects.filter(user=self.user)
+        }
+
+    def test_create_with_unparsed_values(self):
+        Expense.objects.create(user=self.user, category=self.food, title='Lunch', amount='12.50', date='2026-10-01')
+        Expense.objects.create(user=self.user, category=self.food, title='Dinner', amount=Decimal('7.50'), date=date(2026, 10, 20))
+        self.assertEqual(self.buckets(), {(2026, 10, self.food.pk): (Decimal('20.00'), 2)})
+
+    def test_edit_moves_between_buckets(self):
+        expense = Expense.objects.create(user=self.user, category=self.food, title='Lunch', amount=Decimal('12.50'), date=date(2026, 10, 1))
+        expense.category = self.rent
+        expense.date = '2026-09-30'
+        expense.amount = '15.00'
+        expense.save()
+        self.assertEqual(self.buckets(), {(2026, 9, self.rent.pk): (Decimal('15.00'), 1)})
+
+        # Saved without being loaded through from_db
+        Expense(
+            pk=expense.pk, user=self.user, category=None, title='Lunch',
+            amount=Decimal('15.00'), date=date(2026, 9, 30), created_at=expense.created_at,
+        ).save()
+        self.assertEqual(self.buckets(), {(2026, 9, None): (Decimal('15.00'), 1)})
+
+    def test_delete(self):
+        kept = Expense.objects.create(user=self.user, category=self.food, title='Lunch', amount='5.00', date='2026-10-01')
+        deleted = Expense.objects.create(user=self.user, category=self.food, title='Dinner', amount='5.00', date='2026-10-02')
+        deleted.delete()
+        self.assertEqual(self.buckets(), {(2026, 10, self.food.pk): (Decimal('5.00'), 1)})
+        kept.delete()
+        self.assertEqual(self.buckets(), {})
+
+    def test_deleting_a_category_folds_into_uncategorized(self):
+        for category in (self.food, self.rent, None):
+            Expense.objects.create(user=self.user, category=category, title='Spend', amount=Decimal('10.00'), date=date(2026, 10, 1))
+        self.rent.delete()
+        self.assertEqual(self.buckets(), {
+            (2026, 10, self.food.pk): (Decimal('10.00'), 1),
+            (2026, 10, None): (Decimal('20.00'), 2),
+        })
+
+        # Same as recomputing from the expenses, which are now uncategorized
+        folded = self.buckets()
+        MonthlyCategorySpend.rebuild(user=self.user)
+        self.assertEqual(self.buckets(), folded)
+
+
+class BudgetSpendingTests(TestCase):
+    def test_annotations_match_the_python_calculation(self):
+        user = User.objects.create_user('budgeter', password='not-used')
+        cases = [
+            (1, Decimal('1500'), Decimal('1000')),
+            (2, Decimal('1500'), Decimal('1')),
+            (3, Decimal('200.50'), Decimal('350.25')),
+            (4, Decimal('80'), Decimal('0')),
+        ]
+        for month, amount, spent in cases:
+            Budget.objects.create(user=user, month=month, year=2026, amount=amount)
+            if spent:
+                Expense.objects.create(user=user, title='Spend', amount=spent, date=date(2026, month, 15))
+
+        for budget in Budget.objects.with_spending().filter(user=user):
+            plain = Budget.objects.get(pk=budget.pk)
+            with self.subTest(month=budget.month):
+                self.assertEqual(budget.get_total_expenses(), plain.get_total_expenses())
+                self.assertEqual(budget.get_remaining(), plain.get_remaining())
+                self.assertEqual(budget.is_over_budget(), plain.is_over_budget())
+                self.assertEqual(
+                    budget.get_percentage_used(),
+                    Decimal(plain.get_percentage_used()).quantize(Decimal('0.01')),
+                )
+
+
+class CachedCategoryChoiceFieldTests(TestCase):
+    def test_category_deleted_by_another_worker_is_rejected(self):
+        category = Category.objects.create(name='Hobbies')
+        self.assertEqual(get_categories(), [category])
+        self.assertEqual(CachedCategoryChoiceField().clean(category.pk), category)
+
+        # The deleting worker's version bump doesn't reach this one's cache
+        with mock.patch('finance_app.category_cache.get_category_version', return_value=get_category_version()):
+            Category.objects.filter(pk=category.pk).delete()
+            self.assertEqual(get_categories(), [category])
+            with self.assertRaises(ValidationError):
+                CachedCategoryChoiceField().clean(category.pk)
+
+
+class UserDataVersionTests(TestCase):
+    def test_saving_a_profile_keeps_later_bumps(self):
+        user = User.objects.create_user('saver', password='not-used')
+        profile = UserProfile.objects.get(user=user)
+        UserProfile.bump_data_version([user.pk])
+
+        profile.currency_code = 'EUR'
+        profile.save()
+
+        profile.refresh_from_db()
+        self.assertEqual(profile.currency_code, 'EUR')
+        self.assertEqual(profile.data_version, 1)
+
+    def test_deleting_a_user_with_data(self):
+        user = User.objects.create_user('leaving', password='not-used')
+        for n in range(5):
+            Expense.objects.create(user=user, title=f'Expense {n}', amount=Decimal('10.00'))
+        Budget.objects.create(user=user, month=1, year=2026, amount=Decimal('100.00'))
+        Goal.objects.create(user=user, name='Trip', target_amount=Decimal('500.00'))
+
+        user.delete()
+
+        # Nothing re-created for the deleted user (checked at commit otherwise)
+        connection.check_constraints()
+        self.assertFalse(UserProfile.objects.exists())
+        self.assertFalse(MonthlyCategorySpend.objects.exists())
+
+
+def insert_expenses(user, count, start=0):
+    """Insert ``count`` uncategorized expenses for a user in one SQL statement (no signals)"""
+    columns = 'user_id, category_id, title, description, amount, date, created_at, updated_at'
+    if connection.vendor == 'postgresql':
+        sql = f"""
+            INSERT INTO finance_app_expense ({columns})
+            SELECT %s, NULL, 'Expense ' || n, 'Imported', (n % 5000) / 100.0 + 1,
+                   DATE '2026-01-01' - (n % 3000), NOW(), NOW()
+            FROM generate_series(%s + 1, %s + %s) AS n
+        """
+    else:
+        sql = f"""
+            INSERT INTO finance_app_expense ({columns})
+            WITH RECURSIVE seq(n) AS (SELECT %s + 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s + %s)
+            SELECT %s, NULL, 'Expense ' || n, 'Imported', (n % 5000) / 100.0 + 1,
+                   date('2026-01-01', '-' || (n % 3000) || ' days'), datetime('now'), datetime('now')
+            FROM seq
+        """
+    params = [user.pk, start, start, count] if connection.vendor == 'postgresql' else [start, start, count, user.pk]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+@tag('slow')
+class CSVExportMemoryTests(TestCase):
+    """
+    The streamed CSV export's memory use must not grow with the number of rows
+
+    Streams a million rows (about a minute); skip with --exclude-tag slow.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('big-export')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def stream_export(self):
+        """(rows written, peak traced memory in bytes) for a full CSV export"""
+        tracemalloc.start()
+        try:
+            response = self.client.get(reverse('export_csv'))
+            lines = 0
+            for chunk in response.streaming_content:
+                lines += chunk.count(b'\n')
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return lines - 1, peak
+
+    def test_memory_is_flat_from_10k_to_1m_rows(self):
+        insert_expenses(self.user, 10_000)
+        rows, small_peak = self.stream_export()
+        self.assertEqual(rows, 10_000)
+
+        insert_expenses(self.user, 990_000, start=10_000)
+        rows, large_peak = self.stream_export()
+        self.assertEqual(rows, 1_000_000)
+
+        # A buffered export of 1M rows would need ~60 MB for the text alone
+        self.assertLess(large_peak, small_peak * 1.5)
+        self.assertLess(large_peak, 10 * 1024 * 1024)
+
+
+def best_time(func, number=1, repeat=5):
+    """Fastest of ``repeat`` timings of ``number`` calls, in seconds"""
+    return min(timeit.repeat(func, number=number, repeat=repeat))
+
+
+def legacy_format_currency(amount, currency_symbol='$', decimal_places=2):
+    """format_currency as it was before the formatter registry, for comparison"""
+    if amount is None:
+        amount = 0
+    formatted_amount = f"{float(amount):,.{decimal_places}f}"
+    if currency_symbol in ['€', '£', '¥', '₹', '₽', '₺']:
+        return f"{formatted_amount} {currency_symbol}"
+    return f"{currency_symbol}{formatted_amount}"
+
+
+@tag('benchmark')
+class CurrencyFormatterBenchmark(SimpleTestCase):
+    def test_format_many_against_the_float_formatter(self):
+        rng = random.Random(7)
+        amounts = [Decimal(rng.randint(1, 10 ** 8)) / 100 for _ in range(10_000)]
+        for code, symbol in (('USD', '$'), ('EUR', '€')):
+            formatter = get_currency_formatter(code, symbol)
+            with self.subTest(currency=code):
+                self.assertEqual(
+                    formatter.format_many(amounts),
+                    [legacy_format_currency(amount, symbol) for amount in amounts],
+                )
+                legacy = best_time(lambda: [legacy_format_currency(amount, symbol) for amount in amounts], number=5)
+                batch = best_time(lambda: formatter.format_many(amounts), number=5)
+                print(f'\n{code}: 50k amounts, float formatter {legacy:.3f}s, format_many {batch:.3f}s')
+                self.assertLess(batch, legacy)
+
+
+@tag('slow', 'benchmark')
+class PDFExportBenchmark(TestCase):
+    def test_pages_per_second(self):
+        user = User.objects.create_user('pdf_benchmark', password='not-used')
+        formatter = get_currency_formatter('USD', '$')
+        inserted = 0
+        for rows in (1_000, 20_000):
+            insert_expenses(user, rows - inserted, start=inserted)
+            inserted = rows
+            expenses = Expense.objects.filter(user=user).order_by('-date', '-created_at')
+            pages = []
+
+            def export():
+                pages.append(write_expense_pdf(BytesIO(), expenses, formatter, 'Benchmark', f'{rows} rows'))
+
+            elapsed = best_time(export, repeat=2)
+            pages_per_second = pages[-1] / elapsed
+            print(f'\nPDF export: {rows} rows, {pages[-1]} pages in {elapsed:.2f}s ({pages_per_second:.0f} pages/s)')
+            with self.subTest(rows=rows):
+                self.assertGreaterEqual(pages_per_second, PDF_TARGET_PAGES_PER_SECOND)
+
+
+def insert_articles(count):
+    """Insert ``count`` ~3 KB articles in one SQL statement; every 1000th mentions annuities, every 20th bonds"""
+    columns = (
+        'article_type, title, content, summary, category, source, author, image_url, '
+        'is_featured, view_count, created_at, updated_at'
+    )
+    topic = "CASE WHEN n % 1000 = 0 THEN 'annuity ladder' WHEN n % 20 = 0 THEN 'bond funds' ELSE 'index funds' END"
+    filler = 'Spending less than you earn and automating transfers keeps a plan on track. ' * 20
+    if connection.vendor == 'postgresql':
+        sql = f"""
+            INSERT INTO finance_app_article ({columns})
+            SELECT 'article', 'Money note ' || n, %s || {topic} || ' ' || %s, 'Weekly reading', 'Investing',
+                   '', '', '', FALSE, 0, NOW(), NOW()
+            FROM generate_series(1, %s) AS n
+        """
+    else:
+        sql = f"""
+            INSERT INTO finance_app_article ({columns})
+            WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s)
+            SELECT 'article', 'Money note ' || n, %s || {topic} || ' ' || %s, 'Weekly reading', 'Investing',
+                   '', '', '', 0, 0, datetime('now'), datetime('now')
+            FROM seq
+        """
+    params = [filler, filler, count] if connection.vendor == 'postgresql' else [count, filler, filler]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+@tag('slow', 'benchmark')
+class ArticleSearchBenchmark(TestCase):
+    def test_full_text_search_against_icontains_over_100k_articles(self):
+        insert_articles(100_000)
+        articles = Article.objects.all()
+        for term, matches in (('annuity', 100), ('bond', 5_000)):
+            with self.subTest(term=term):
+                # The search articles_view ran before the full-text index
+                def scan():
+                    return list(articles.filter(
+                        Q(title__icontains=term) | Q(content__icontains=term) | Q(summary__icontains=term)
+                    )[:SEARCH_RESULT_LIMIT])
+
+                results = search_articles(articles, term)
+                self.assertEqual(len(results), min(matches, SEARCH_RESULT_LIMIT))
+                self.assertIn(f'<mark>{term}', results[0].search_snippet.lower())
+                self.assertEqual(len(scan()), min(matches, SEARCH_RESULT_LIMIT))
+
+                indexed = best_time(lambda: search_articles(articles, term), repeat=3)
+                scanned = best_time(scan, repeat=3)
+                print(f'\n{term!r} in 100k articles ({matches} matches): '
+                      f'icontains {scanned * 1000:.0f}ms, full-text {indexed * 1000:.0f}ms')
+                self.assertLess(indexed, scanned)
+
+
+class MonthRangeTests(SimpleTestCase):
+    def test_shift_month_crosses_years(self):
+        self.assertEqual(shift_month(2026, 1, -1), (2025, 12))
+        self.assertEqual(shift_month(2026, 12, 1), (2027, 1))
+        self.assertEqual(shift_month(2026, 3, -14), (2025, 1))
+
+    def test_month_range_is_half_open(self):
+        self.assertEqual(month_range(2024, 2), (date(2024, 2, 1), date(2024, 3, 1)))
+        self.assertEqual(month_range(2026, 12), (date(2026, 12, 1), date(2027, 1, 1)))
+
+    def test_last_n_months_has_no_gaps_or_repeats(self):
+        # Stepping back 30 days at a time from March 31 skips February
+        self.assertEqual(
+            last_n_months(4, date(2026, 3, 31)),
+            [(2025, 12), (2026, 1), (2026, 2), (2026, 3)],
+        )
+
+
+class MonthRangeIndexTests(TestCase):
+    """The month filters must be range conditions on the (user, -date) index"""
+
+    INDEX = 'finance_app_user_id_fe5643_idx'
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # The test tables are tiny; make the planner show whether it *can*
+            # use the index rather than whether a scan is cheaper
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def range_plan_pattern(self):
+        if connection.vendor == 'sqlite':
+            return rf'SEARCH .*USING INDEX {self.INDEX} \(user_id=\? AND date>\? AND date<\?\)'
+        if connection.vendor == 'postgresql':
+            return (
+                rf'Index (Only )?Scan .*using {self.INDEX}[\s\S]*Index Cond: '
+                rf'\(\(user_id = \d+\) AND \(date >= .*\) AND \(date < .*\)\)'
+            )
+        self.skipTest(f'No expected plan for {connection.vendor}')
+
+    def test_month_filter_is_an_index_range_scan(self):
+        user = User.objects.create_user('explain')
+        plan = self.explain(Expense.objects.filter(user=user, **month_range_filter(2026, 10)))
+        self.assertRegex(plan, self.range_plan_pattern())
+
+
+class BudgetTipTests(SimpleTestCase):
+    def test_last_day_of_month_at_budget(self):
+        # 1000 / 30 * 30 > 1000 in floats; with no days left this used to
+        # divide by zero
+        history = SpendingHistory([(date(2026, 11, 2), Decimal('1000'), 'Food')], date(2026, 11, 30))
+        tip = budget_tip(history, 1000.0, '$')
+        self.assertIn('under your $1000.00 budget', tip)
+
+    def test_last_day_of_month_over_budget(self):
+        history = SpendingHistory([(date(2026, 11, 2), Decimal('1200'), 'Food')], date(2026, 11, 30))
+        tip = budget_tip(history, 1000.0, '$')
+        self.assertIn('$200.00 over', tip)
+
+    def test_projected_overspend_mid_month(self):
+        history = SpendingHistory([(date(2026, 11, 2), Decimal('600'), 'Food')], date(2026, 11, 15))
+        tip = budget_tip(history, 1000.0, '$')
+        self.assertIn('$1200.00 this month', tip)
+        self.assertIn('$26.67 a day for the remaining 15 days', tip)
+
+
+class NewsAPIStub:
+    """
+    Local HTTP server standing in for NewsAPI
+
+    ``pages`` maps a page number to a list of items, or to an HTTP status
+    for an error response; ``earlier_pages`` does the same for requests
+    ending at a ``to`` time (resumed windows). Received query parameters are
+    kept in ``requests``.
+    """
+
+    def __init__(self, pages, total_results=None, earlier_pages=None):
+        self.pages = pages
+        self.total_results = total_results
+        self.earlier_pages = earlier_pages or {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {name: values[0] for name, values in parse_qs(urlparse(self.path).query).items()}
+                stub.requests.append(params)
+                pages = stub.earlier_pages if 'to' in params else stub.pages
+                total_results = None if 'to' in params else stub.total_results
+                page = pages.get(int(params['page']), [])
+                if isinstance(page, int):
+                    status, body = page, {
+                        'status': 'error',
+                        'code': 'maximumResultsReached',
+                        'message': 'You have requested too many results',
+                    }
+                else:
+                    status, body = 200, {
+                        'status': 'ok',
+                        'totalResults': total_results or sum(
+                            len(items) for items in pages.values() if not isinstance(items, int)
+                        ),
+                        'articles': page,
+                    }
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/v2/everything'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class AsyncClientTests(SimpleTestCase):
+    async def use_twice(self):
+        async with async_client() as first:
+            pass
+        async with async_client() as second:
+            pass
+        return first, second
+
+    def test_each_use_gets_a_closed_client_outside_asgi(self):
+        # Async views under WSGI run on a new event loop per request
+        first, second = async_to_sync(self.use_twice)()
+        self.assertIsNot(first, second)
+        self.assertTrue(first.is_closed)
+        self.assertTrue(second.is_closed)
+
+    def test_clients_are_shared_per_event_loop_under_asgi(self):
+        with mock.patch('finance_app.outbound._share_async_clients', True):
+            first, second = async_to_sync(self.use_twice)()
+        self.addCleanup(async_to_sync(first.aclose))
+        self.assertIs(first, second)
+        self.assertFalse(first.is_closed)
+
+
+class OpenAIStub:
+    """
+    Local HTTP server standing in for the OpenAI chat completions API
+
+    Every response is delayed by ``latency`` seconds. Requests whose
+    1-based number is in ``failures`` get a 500 instead of tips.
+    """
+
+    def __init__(self, latency=0, failures=()):
+        self.latency = latency
+        self.failures = set(failures)
+        self.requests = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers['Content-Length']))
+                with stub._lock:
+                    stub.requests += 1
+                    number = stub.requests
+                    stub._in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub._in_flight)
+                time.sleep(stub.latency)
+                with stub._lock:
+                    stub._in_flight -= 1
+                if number in stub.failures:
+                    status, body = 500, {'error': {'message': 'The server had an error', 'type': 'server_error'}}
+                else:
+                    content = (
+                        f'1. Cook at home twice more a week to cut your food spending (reply {number}).\n'
+                        '2. Move the money you save into your emergency fund every payday.'
+                    )
+                    status, body = 200, {'choices': [{'message': {'role': 'assistant', 'content': content}}]}
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 128
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/v1/chat/completions'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class OpenAIStubMixin:
+    """Route the OpenAI tips backend to an OpenAIStub with a fresh breaker and empty caches"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        caches['tips'].clear()
+        self.enterContext(mock.patch.object(openai_service, 'breaker', CircuitBreaker()))
+        self.enterContext(mock.patch.dict(os.environ, OPENAI_API_KEY='test-key'))
+        self.enterContext(override_settings(TIPS_BACKEND='auto'))
+
+    def openai_stub(self, **kwargs):
+        stub = OpenAIStub(**kwargs)
+        self.enterContext(stub)
+        self.enterContext(override_settings(OPENAI_API_URL=stub.url))
+        return stub
+
+
+@tag('slow', 'benchmark')
+class AsyncTipsLoadTest(OpenAIStubMixin, TestCase):
+    """
+    Under ASGI, requests waiting on a slow OpenAI must not hold up other pages
+
+    Twenty users ask for tips at once from a stub that takes a second to
+    answer, while another user keeps loading the budget list.
+    """
+    LATENCY = 1.0
+    TIP_USERS = 20
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tip_users = []
+        for n in range(cls.TIP_USERS):
+            user = User.objects.create_user(f'tips-load-{n}')
+            # Distinct spending, so no two requests are coalesced upstream
+            Expense.objects.create(user=user, title='Groceries', amount=Decimal(n + 1), date=timezone.localdate())
+            cls.tip_users.append(user)
+        cls.browsing_user = User.objects.create_user('tips-load-browsing')
+
+    async def test_other_endpoints_stay_responsive_while_tips_wait_on_openai(self):
+        stub = self.openai_stub(latency=self.LATENCY)
+        tip_clients = []
+        for user in self.tip_users:
+            client = AsyncClient()
+            await client.aforce_login(user)
+            tip_clients.append(client)
+        browser = AsyncClient()
+        await browser.aforce_login(self.browsing_user)
+
+        async def browse(tips):
+            latencies = []
+            while not tips.done():
+                started = time.perf_counter()
+                response = await browser.get(reverse('budget_list'))
+                latencies.append(time.perf_counter() - started)
+                self.assertEqual(response.status_code, 200)
+            return latencies
+
+        started = time.perf_counter()
+        tips = asyncio.ensure_future(asyncio.gather(*(client.get(reverse('ai_tips')) for client in tip_clients)))
+        latencies = await browse(tips)
+        elapsed = time.perf_counter() - started
+
+        for response in tips.result():
+            self.assertEqual(response.status_code, 200)
+            self.assertIsNone(response.context['error_message'])
+        self.assertEqual(stub.requests, self.TIP_USERS)
+        print(
+            f'\n{self.TIP_USERS} tip requests against {self.LATENCY:.1f}s of OpenAI latency took {elapsed:.2f}s '
+            f'({stub.max_in_flight} in flight at once); {len(latencies)} budget list loads meanwhile, '
+            f'median {median(latencies) * 1000:.0f}ms, slowest {max(latencies) * 1000:.0f}ms'
+        )
+        # The tip requests waited on OpenAI together rather than one by one...
+        self.assertEqual(stub.max_in_flight, self.TIP_USERS)
+        self.assertLess(elapsed, 3 * self.LATENCY)
+        # ...and other pages kept being served while they did. The slowest load
+        # only queues behind the tip views' own database work, never behind OpenAI
+        self.assertGreater(len(latencies), 5)
+        self.assertLess(median(latencies), self.LATENCY / 10)
+        self.assertLess(max(latencies), self.LATENCY)
+
+
+class GenerateTipsCommandTests(OpenAIStubMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.active_users = []
+        for n in range(6):
+            user = User.objects.create_user(f'nightly-{n}')
+            Expense.objects.create(user=user, title='Rent', amount=Decimal(500 + n), date=timezone.localdate())
+            cls.active_users.append(user)
+        User.objects.create_user('dormant', last_login=timezone.now() - timedelta(days=30))
+
+    def generate_tips(self, **options):
+        out = StringIO()
+        call_command('generate_tips', stdout=out, **options)
+        return out.getvalue()
+
+    def test_reports_throughput_and_failures_with_bounded_concurrency(self):
+        stub = self.openai_stub(latency=0.1, failures={2})
+        output = self.generate_tips(workers=3, chunk_size=4)
+
+        self.assertEqual(stub.requests, 6)
+        self.assertEqual(stub.max_in_flight, 3)
+        self.assertEqual(GeneratedTips.objects.count(), 5)
+        self.assertIn('Generated tips for 5 of 6 users', output)
+        self.assertRegex(output, r'in [\d.]+s \([\d.]+ users/s\); 0 unchanged, 1 failed')
+        self.assertIn('1 x HTTPError: 500 Server Error', output)
+
+        # Only the failed user is retried; the rest still match their spending
+        output = self.generate_tips(workers=3)
+        self.assertEqual(stub.requests, 7)
+        self.assertIn('Generated tips for 1 of 6 users', output)
+        self.assertIn('5 unchanged, 0 failed', output)
+
+    def test_view_serves_pregenerated_tips_without_calling_openai(self):
+        stub = self.openai_stub()
+        self.generate_tips()
+        self.assertEqual(stub.requests, 6)
+        caches['tips'].clear()
+
+        self.client.force_login(self.active_users[0])
+        response = self.client.get(reverse('ai_tips'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['tips_cached'])
+        self.assertEqual(stub.requests, 6)
+
+
+def news_item(n, published_at='2026-10-01T12:00:00Z'):
+    return {
+        'url': f'https://news.example.com/{n}',
+        'title': f'Headline {n}',
+        'description': f'Summary {n}',
+        'content': f'Body {n}',
+        'author': 'Reporter',
+        'publishedAt': published_at,
+    }
+
+
+@mock.patch('finance_app.news.NEWS_PAGE_SIZE', 2)
+class NewsIngestTests(TestCase):
+    def setUp(self):
+        # Failures recorded by one test mustn't open the breaker for the next
+        patcher = mock.patch.object(newsapi_service, 'breaker', CircuitBreaker())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def ingest(self, stub, use_async=False):
+        with override_settings(NEWS_API_URL=stub.url):
+            if use_async:
+                return async_to_sync(aingest_news)(api_key='test-key')
+            return ingest_news(api_key='test-key')
+
+    def test_stores_pages_and_deduplicates(self):
+        with NewsAPIStub({1: [news_item(1), news_item(2)], 2: [news_item(2), news_item(3)]}) as stub:
+            self.assertEqual(self.ingest(stub), (3, 3, None))
+            self.assertEqual(Article.objects.filter(article_type='news').count(), 3)
+
+            stub.pages = {1: [news_item(3), news_item(4, '2026-10-02T08:00:00Z')]}
+            self.assertEqual(self.ingest(stub), (2, 1, None))
+
+        self.assertEqual(Article.objects.filter(article_type='news').count(), 4)
+        # The second run only asked for items since the newest stored one
+        self.assertNotIn('from', stub.requests[0])
+        self.assertEqual(stub.requests[-1]['from'], '2026-10-01T12:00:00+00:00')
+
+    def test_later_page_failure_keeps_fetched_pages(self):
+        # Developer keys get an error past the first 100 results
+        with NewsAPIStub({1: [news_item(1), news_item(2)], 2: 426}, total_results=500) as stub:
+            fetched, created, error = self.ingest(stub)
+        self.assertEqual((fetched, created), (2, 2))
+        self.assertIsInstance(error, NewsIngestError)
+        self.assertEqual(Article.objects.filter(article_type='news').count(), 2)
+
+    def test_later_page_failure_keeps_fetched_pages_async(self):
+        pages = {1: [news_item(1), news_item(2)], 2: 426, 3: [news_item(5), news_item(6)]}
+        with NewsAPIStub(pages, total_results=6) as stub:
+            fetched, created, error = self.ingest(stub, use_async=True)
+        self.assertEqual((fetched, created), (4, 4))
+        self.assertIsInstance(error, NewsIngestError)
+        self.assertEqual(Article.objects.filter(article_type='news').count(), 4)
+
+    def check_gap_is_resumed(self, use_async):
+        Article.objects.create(
+            article_type='news', title='Stored', content='...', url_hash='stored',
+            published_at=datetime(2026, 10, 1, tzinfo=dt_timezone.utc),
+        )
+        newest = [news_item(4, '2026-10-05T12:00:00Z'), news_item(3, '2026-10-04T12:00:00Z')]
+        with NewsAPIStub({1: newest, 2: 426, 3: [news_item(1, '2026-10-02T12:00:00Z')]}, total_results=5) as stub:
+            fetched, created, error = self.ingest(stub, use_async)
+        self.assertIsInstance(error, NewsIngestError)
+        gap = NewsIngestGap.objects.get()
+        self.assertEqual(gap.published_after, datetime(2026, 10, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(gap.published_before, datetime(2026, 10, 4, 12, tzinfo=dt_timezone.utc))
+
+        # Nothing newer yet; the window is paged from its oldest fetched item
+        earlier = [news_item(3, '2026-10-04T12:00:00Z'), news_item(2, '2026-10-03T12:00:00Z')]
+        with NewsAPIStub({1: []}, earlier_pages={1: earlier, 2: [news_item(1, '2026-10-02T12:00:00Z')]}) as stub:
+            fetched, created, error = self.ingest(stub, use_async)
+        self.assertEqual((fetched, error), (3, None))
+        self.assertEqual(stub.requests[0]['from'], '2026-10-05T12:00:00+00:00')
+        self.assertEqual(stub.requests[1]['from'], '2026-10-01T00:00:00+00:00')
+        self.assertEqual(stub.requests[1]['to'], '2026-10-04T12:00:00+00:00')
+        self.assertFalse(NewsIngestGap.objects.exists())
+        self.assertEqual(Article.objects.filter(article_type='news').count(), 5)
+
+    def test_gap_left_by_a_failed_page_is_resumed(self):
+        self.check_gap_is_resumed(use_async=False)
+
+    def test_gap_left_by_a_failed_page_is_resumed_async(self):
+        self.check_gap_is_resumed(use_async=True)
+
+    def test_first_page_failure_raises(self):
+        with NewsAPIStub({1: 500}) as stub:
+            with self.assertRaises(NewsIngestError):
+                self.ingest(stub)
+        self.assertFalse(Article.objects.exists())
+
+
+class ExportWorkerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('exporter')
+        Expense.objects.create(user=self.user, title='Rent', amount=Decimal('900'), date=date(2026, 10, 1))
+
+    def abandoned_job(self, attempts=1, minutes_ago=None):
+        heartbeat = timezone.now() - timedelta(
+            minutes=minutes_ago if minutes_ago is not None else EXPORT_LEASE_SECONDS // 60 + 1
+        )
+        return ExportJob.objects.create(
+            user=self.user, format='csv', fingerprint='abc', status='running',
+            started_at=heartbeat, heartbeat_at=heartbeat, attempts=attempts, progress=40,
+        )
+
+    def test_abandoned_job_is_requeued_and_completed(self):
+        job = self.abandoned_job()
+        call_command('run_export_worker', once=True, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.attempts, 2)
+        self.assertTrue(job.has_artifact())
+
+    def test_job_with_recent_heartbeat_is_left_running(self):
+        job = self.abandoned_job(minutes_ago=1)
+        self.assertEqual(requeue_stale_jobs(), (0, 0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'running')
+
+    def test_job_out_of_attempts_is_failed(self):
+        job = self.abandoned_job(attempts=EXPORT_MAX_ATTEMPTS)
+        self.assertEqual(requeue_stale_jobs(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+
+    @mock.patch('finance_app.storage.ARTIFACT_CHUNK_BYTES', 64)
+    def test_queued_export_is_downloaded_from_the_database(self):
+        for n in range(20):
+            Expense.objects.create(user=self.user, title=f'Expense {n}', amount=Decimal('12.50'), date=date(2026, 9, 1))
+        self.client.force_login(self.user)
+        job = self.client.post(reverse('export_job_create'), {'format': 'csv'}).json()
+        call_command('run_export_worker', once=True, stdout=StringIO())
+
+        status = self.client.get(job['status_url']).json()
+        self.assertEqual(status['status'], 'completed')
+        response = self.client.get(status['download_url'])
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual(content.splitlines()[0], 'Date,Title,Category,Amount,Description')
+        self.assertEqual(len(content.splitlines()), 22)
+        self.assertEqual(int(response['Content-Length']), len(content.encode('utf-8')))
+
+        ExportArtifactChunk.objects.all().delete()
+        self.assertEqual(self.client.get(status['download_url']).status_code, 404)
+
+    @mock.patch('finance_app.exports.EXPORT_HEARTBEAT_SECONDS', 0)
+    def test_pdf_layout_keeps_reporting_progress(self):
+        Expense.objects.bulk_create([
+            Expense(user=self.user, title=f'Expense {n}', amount=Decimal('12.50'), date=date(2026, 9, 1))
+            for n in range(300)
+        ])
+        job = ExportJob.objects.create(user=self.user, format='pdf', fingerprint='pdf', status='running')
+        reported = []
+
+        def record_progress(execute, sql, params, many, context):
+            if sql.startswith('UPDATE "finance_app_exportjob" SET "progress"'):
+                reported.append(params[0])
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record_progress):
+            run_export_job(job)
+
+        # Rows fill the first half; each laid-out page keeps the heartbeat going
+        layout = [percent for percent in reported if percent > 50]
+        self.assertGreaterEqual(len(layout), 9)
+        self.assertEqual(reported, sorted(reported))
+        self.assertLessEqual(reported[-1], 99)
+
+    def test_purge_deletes_expired_jobs_and_their_files(self):
+        expired = ExportJob.objects.create(user=self.user, format='csv', fingerprint='old')
+        recent = ExportJob.objects.create(user=self.user, format='csv', fingerprint='new')
+        for job in (expired, recent):
+            run_export_job(job)
+        ExportJob.objects.filter(pk=expired.pk).update(finished_at=timezone.now() - EXPORT_RETENTION - timedelta(hours=1))
+        ExportArtifactChunk.objects.create(name='orphan.csv', index=0, data=b'left behind')
+
+        self.assertEqual(purge_old_exports(), 1)
+        self.assertEqual(list(ExportJob.objects.all()), [recent])
+        self.assertEqual(
+            set(ExportArtifactChunk.objects.values_list('name', flat=True)),
+            {recent.artifact.name},
+        )
+
+    @mock.patch('finance_app.management.commands.run_export_worker.close_old_connections')
+    @mock.patch('finance_app.management.commands.run_export_worker.time.sleep', side_effect=[None, KeyboardInterrupt])
+    @mock.patch(
+        'finance_app.management.commands.run_export_worker.claim_next_job',
+        side_effect=[OperationalError('server closed the connection'), None],
+    )
+    def test_worker_keeps_polling_after_a_database_error(self, claim_next_job, sleep, close_old_connections):
+        stderr = StringIO()
+        with self.assertRaises(KeyboardInterrupt):
+            call_command('run_export_worker', stdout=StringIO(), stderr=stderr)
+        self.assertEqual(claim_next_job.call_count, 2)
+        self.assertIn('server closed the connection', stderr.getvalue())
+        close_old_connections.assert_called_once()
+
+
+class ArticleSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.in_title = Article.objects.create(title='Budgeting for beginners', content='Start small. ' * 50)
+        cls.in_content = Article.objects.create(
+            title='Weekly money habits', content='Plenty of filler. ' * 30 + 'A monthly budgeting routine helps.',
+        )
+        Article.objects.create(title='Index funds', content='Long term investing. ' * 50)
+
+    def test_ranked_with_highlighted_snippets(self):
+        results = search_articles(Article.objects.all(), 'budgeting')
+        self.assertEqual(results, [self.in_title, self.in_content])
+        self.assertIn('<mark>budgeting</mark>', results[1].search_snippet)
+
+    def test_last_word_matches_as_a_prefix_and_operators_are_literal(self):
+        self.assertEqual(search_articles(Article.objects.all(), 'index fu'), [Article.objects.get(title='Index funds')])
+        self.assertEqual(search_articles(Article.objects.all(), 'NEAR(") OR'), [])
+
+    def test_search_respects_the_queryset(self):
+        results = search_articles(Article.objects.exclude(pk=self.in_title.pk), 'budgeting')
+        self.assertEqual(results, [self.in_content])
+        self.assertEqual(search_articles(Article.objects.none(), 'budgeting'), [])
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite FTS5 triggers')
+    def test_triggers_dropped_by_a_table_rebuild_are_restored_after_migrate(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {FTS_TABLE}_ai')
+        added = Article.objects.create(title='Emergency fund budgeting', content='Three months of costs.')
+        self.assertNotIn(added, search_articles(Article.objects.all(), 'emergency'))
+
+        emit_post_migrate_signal(verbosity=0, interactive=False, db=connection.alias)
+
+        self.assertEqual(search_articles(Article.objects.all(), 'emergency'), [added])
+
+
+@mock.patch('finance_app.counters._start_flush_thread', lambda: None)
+class ArticleViewCounterTests(TestCase):
+    def setUp(self):
+        self.article = Article.objects.create(title='Budgeting 101', content='...')
+        counters.flush_view_counts()
+        cache.clear()
+
+    def test_timer_flushes_without_further_views(self):
+        with mock.patch('finance_app.counters.VIEW_FLUSH_SECONDS', 3600):
+            for _ in range(3):
+                counters.record_article_view(self.article.pk)
+            counters.flush_due_views()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 0)
+        self.assertEqual(counters.live_view_count(self.article), 3)
+
+        # What the flush thread does on its next tick once the timer has run out
+        with mock.patch('finance_app.counters.VIEW_FLUSH_SECONDS', 0):
+            counters.flush_due_views()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 3)
+        self.assertEqual(counters.live_view_count(self.article), 3)
+
+    def test_failed_write_is_retried_by_the_next_flush(self):
+        with mock.patch('finance_app.counters.VIEW_FLUSH_SECONDS', 3600):
+            for _ in range(3):
+                counters.record_article_view(self.article.pk)
+            counters.push_buffered_views()
+
+        def fail_article_update(execute, sql, params, many, context):
+            if sql.startswith('UPDATE "finance_app_article"'):
+                raise OperationalError('database is locked')
+            return execute(sql, params, many, context)
+
+        with self.assertRaises(OperationalError), transaction.atomic():
+            with connection.execute_wrapper(fail_article_update):
+                counters.flush_view_counts()
+        self.assertEqual(counters.live_view_count(self.article), 3)
+
+        self.assertEqual(counters.flush_view_counts(), 3)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.view_count, 3)
+
+
+# Per-view SQL query budgets: url name -> (max queries, max duplicate
+# queries). Every named URL in finance_app/urls.py must have an entry. Session + user lookups (2 queries)
+# are included in the counts.
+QUERY_BUDGETS = {
+    'login': (0, 0),
+    'logout': (4, 0),
+    'signup': (0, 0),
+    'dashboard': (6, 0),
+    'expense_list': (4, 0),
+    'expense_rows': (3, 0),
+    'expense_create': (2, 0),
+    'expense_edit': (3, 0),
+    'expense_delete': (3, 0),
+    'budget_list': (3, 0),
+    'budget_create': (2, 0),
+    'reports': (4, 0),
+    'export_csv': (3, 0),
+    'export_pdf': (4, 0),
+    'export_job_create': (5, 0),
+    'export_job_status': (3, 0),
+    'export_job_download': (5, 0),
+    'ai_tips': (5, 0),
+    'ai_tips_stream': (5, 0),
+    'outbound_status': (2, 0),
+    'articles': (6, 0),
+    'article_create': (2, 0),
+    'article_detail': (6, 0),
+    'goals': (4, 0),
+    'goal_create': (2, 0),
+    'goal_edit': (3, 0),
+    'goal_delete': (3, 0),
+    'goal_add_progress': (5, 0),
+}
+
+# Requests that aren't a plain GET answered with a 200:
+# url name -> (method, data, expected status)
+REQUEST_OVERRIDES = {
+    'logout': ('post', {}, 302),
+    'export_job_create': ('post', {'format': 'csv'}, 202),
+    'goal_add_progress': ('post', {'amount': '25.00'}, 200),
+}
+
+# URLs that take a pk: url name -> which seeded object to use
+URL_OBJECTS = {
+    'expense_edit': 'expense',
+    'expense_delete': 'expense',
+    'goal_edit': 'goal',
+    'goal_delete': 'goal',
+    'goal_add_progress': 'goal',
+    'article_detail': 'article',
+    'export_job_status': 'export_job',
+    'export_job_download': 'export_job',
+}
+
+SEED_USERS = 3
+SEED_MONTHS = 24
+SEED_EXPENSES_PER_MONTH = 40
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def query_shape(sql):
+    """SQL with literal values replaced, so repeated lookups with different ids match"""
+    return _LITERALS.sub('?', sql)
+
+
+async def consume_async(iterator):
+    async for _ in iterator:
+        pass
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every finance_app URL against its query budget
+
+    Several users' worth of realistic data is seeded, then each URL is
+    requested as a logged-in user while the executed SQL is captured. A view
+    fails if it runs more queries than allowed or repeats the same query
+    shape (the signature of an N+1 loop) more often than allowed; the
+    failure lists the repeated shapes and every query, with the ones over
+    budget marked. Also run by ``manage.py check_query_budgets``.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """Several users with two years of expenses, budgets, goals and articles"""
+        call_command('create_default_categories', stdout=StringIO())
+        categories = list(Category.objects.all())
+        rng = random.Random(42)
+        today = timezone.localdate()
+
+        users = []
+        for index in range(SEED_USERS):
+            # The measured user is staff so staff-only views are measured too
+            user = User.objects.create_user(f'budget_user_{index}', password='not-used', is_staff=index == 0)
+            users.append(user)
+            expenses = []
+            for day in range(SEED_MONTHS * 30):
+                for _ in range(SEED_EXPENSES_PER_MONTH // 30 + 1):
+                    expenses.append(Expense(
+                        user=user,
+                        category=rng.choice(categories + [None]),
+                        title=f'Expense {len(expenses)}',
+                        amount=Decimal(rng.randint(100, 50000)) / 100,
+                        date=today - timedelta(days=day - 3),
+                    ))
+            Expense.objects.bulk_create(expenses, batch_size=1000)
+            for months_back in range(12):
+                year, month = shift_month(today.year, today.month, -months_back)
+                Budget.objects.create(user=user, month=month, year=year, amount=Decimal('1500.00'))
+            for goal_index in range(5):
+                Goal.objects.create(
+                    user=user, name=f'Goal {goal_index}',
+                    target_amount=Decimal('1000.00'), current_amount=Decimal(goal_index * 150),
+                )
+            Article.objects.bulk_create([
+                Article(
+                    user=user, title=f'Article {index}-{n}', content='Saving money ' * 200,
+                    summary='Tips', category=rng.choice(['Savings', 'Investing', 'Budgeting']),
+                    is_featured=n < 2,
+                )
+                for n in range(10)
+            ])
+        Article.objects.bulk_create([
+            Article(article_type='news', title=f'News {n}', content='Markets ' * 100, category='News')
+            for n in range(10)
+        ])
+        MonthlyCategorySpend.rebuild()
+
+        cls.user = user = users[0]
+        export_job = ExportJob.objects.create(user=user, format='csv', fingerprint='seed', status='running')
+        run_export_job(export_job)
+        cls.url_objects = {
+            'expense': {'pk': user.expenses.first().pk},
+            'goal': {'pk': user.goals.first().pk},
+            'article': {'pk': Article.objects.filter(article_type='article').first().pk},
+            'export_job': {'pk': export_job.pk},
+        }
+
+    def setUp(self):
+        # Keep external APIs out of the measurement
+        patcher = mock.patch.dict(os.environ, {'OPENAI_API_KEY': '', 'NEWS_API_KEY': ''})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_every_url_has_a_budget(self):
+        missing = {pattern.name for pattern in urlpatterns if pattern.name and pattern.name not in QUERY_BUDGETS}
+        self.assertFalse(missing, f"No query budget declared for: {', '.join(sorted(missing))}")
+
+    def test_views_stay_within_their_query_budgets(self):
+        checked = set()
+        for pattern in urlpatterns:
+            name = pattern.name
+            if not name or name in checked or name not in QUERY_BUDGETS:
+                continue
+            checked.add(name)
+            with self.subTest(view=name):
+                self.check_budget(name)
+
+    def check_budget(self, name):
+        client = Client()
+        if name not in ('login', 'signup'):
+            client.force_login(self.user)
+        obj = URL_OBJECTS.get(name)
+        url = reverse(name, kwargs=self.url_objects[obj] if obj else {})
+        method, data, expected_status = REQUEST_OVERRIDES.get(name, ('get', {}, 200))
+        # Every view is measured with a cold per-user cache and the
+        # process-wide category cache warm, as on a running worker
+        cache.clear()
+        caches['tips'].clear()
+        get_categories()
+
+        with CaptureQueriesContext(connection) as captured:
+            response = getattr(client, method)(url, data)
+            if getattr(response, 'streaming', False):
+                if response.is_async:
+                    async_to_sync(consume_async)(response.streaming_content)
+                else:
+                    for _ in response.streaming_content:
+                        pass
+
+        self.assertEqual(
+            response.status_code, expected_status, f'{method.upper()} {url} is not measuring the view itself'
+        )
+        if response.get('Content-Type') == 'application/json':
+            # JSON endpoints that report errors with a 200
+            self.assertIsNot(response.json().get('success'), False, f'{method.upper()} {url}: {response.json()}')
+
+        queries = [query['sql'] for query in captured.captured_queries]
+        shapes = Counter(query_shape(sql) for sql in queries)
+        duplicates = sum(count - 1 for count in shapes.values())
+        max_queries, max_duplicates = QUERY_BUDGETS[name]
+        if len(queries) > max_queries or duplicates > max_duplicates:
+            self.fail(
+                f'{method.upper()} {url} ({response.status_code}) ran {len(queries)}/{max_queries} queries, '
+                f'{duplicates}/{max_duplicates} duplicates\n' + offending_sql(queries, shapes, max_queries)
+            )
+
+
+def offending_sql(queries, shapes, max_queries):
+    """Repeated query shapes first, then the full query list with overruns marked"""
+    lines = [f'  x{count}  {shape}' for shape, count in shapes.most_common() if count > 1]
+    for number, sql in enumerate(queries, start=1):
+        marker = '+' if number > max_queries else ' '
+        lines.append(f'{marker} {number:>3}. {sql}')
+    return '\n'.join(lines)
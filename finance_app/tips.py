@@ -0,0 +1,629 @@
+"""
+Savings tips from a pluggable backend (settings.TIPS_BACKEND)
+
+LocalTipBackend computes rules-based insights from the user's history on
+every request (see insights.py). OpenAITipBackend asks OpenAI, which is
+slow and costs money.
+
+Remote tips are stored under a fingerprint of the inputs that go into
+the prompt. Refreshing the page therefore costs one cache lookup until the
+user's spending actually changes. The latest tips per user are also kept in
+the database (GeneratedTips), which the generate_tips command fills ahead
+of time. A cache miss falls back to that row when its fingerprint still
+matches. The cache alias applies a TTL and evicts least-recently-used
+entries (see CACHES in settings). An explicit regenerate request skips the
+lookup and replaces the stored tips.
+
+astream_savings_tips() streams tips as OpenAI writes them, for the
+server-sent events endpoint.
+
+Calls to OpenAI go through the outbound layer. Identical concurrent
+requests share one upstream call. While OpenAI keeps failing, the circuit
+breaker makes callers fall back at once instead of waiting out the timeout.
+"""
+import json
+import os
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .cache_utils import filter_fingerprint
+from .currency_utils import get_user_currency
+from .insights import spending_insights
+from .models import GeneratedTips
+from .outbound import HAS_HTTPX, HAS_REQUESTS, async_client, get_session, openai_service
+from .spending import get_spending_snapshot
+
+OPENAI_TIMEOUT = 10
+
+# General advice that pads out the local backend's insights
+DEFAULT_TIPS = [
+    "Track your spending daily to identify unnecessary expenses.",
+    "Set up automatic transfers to a savings account each payday.",
+    "Review subscriptions monthly and cancel unused services.",
+    "Use the 24-hour rule: wait a day before making non-essential purchases.",
+    "Cook at home more often - it's healthier and cheaper than eating out.",
+    "Compare prices before making large purchases.",
+    "Build an emergency fund covering 3-6 months of expenses."
+]
+
+SYSTEM_PROMPT = (
+    'You are an expert personal financial advisor. You analyze spending data and provide '
+    'SPECIFIC, PERSONALIZED savings tips tailored to each individual\'s unique spending '
+    'patterns. Never give generic advice - always reference the user\'s actual data.'
+)
+
+
+def tips_cache():
+    return caches['tips']
+
+
+def has_openai_key():
+    return bool(os.environ.get('OPENAI_API_KEY'))
+
+
+def tips_fingerprint(spending_summary, currency_symbol):
+    """Hash of exactly the inputs the tips prompt is built from"""
+    return filter_fingerprint({'summary': spending_summary, 'currency': currency_symbol})
+
+
+def tips_cache_key(user_id, fingerprint):
+    return f'finance_app:ai_tips:{user_id}:{fingerprint}'
+
+
+def load_tips(user_id, fingerprint):
+    """Stored tips entry for this fingerprint (the cache, then the database), or None"""
+    cache = tips_cache()
+    key = tips_cache_key(user_id, fingerprint)
+    entry = cache.get(key)
+    if entry is None:
+        entry = GeneratedTips.objects.filter(
+            user_id=user_id, fingerprint=fingerprint
+        ).values('tips', 'generated_at').first()
+        if entry is not None:
+            cache.set(key, entry)
+    return entry
+
+
+async def aload_tips(user_id, fingerprint):
+    """Async load_tips()"""
+    cache = tips_cache()
+    key = tips_cache_key(user_id, fingerprint)
+    entry = await cache.aget(key)
+    if entry is None:
+        entry = await GeneratedTips.objects.filter(
+            user_id=user_id, fingerprint=fingerprint
+        ).values('tips', 'generated_at').afirst()
+        if entry is not None:
+            await cache.aset(key, entry)
+    return entry
+
+
+def save_tips(user_id, fingerprint, tips):
+    """Store freshly generated tips in the cache and the database; returns the entry"""
+    entry = {'tips': tips, 'generated_at': timezone.now()}
+    tips_cache().set(tips_cache_key(user_id, fingerprint), entry)
+    GeneratedTips.objects.update_or_create(user_id=user_id, defaults={'fingerprint': fingerprint, **entry})
+    return entry
+
+
+async def asave_tips(user_id, fingerprint, tips):
+    """Async save_tips()"""
+    entry = {'tips': tips, 'generated_at': timezone.now()}
+    await tips_cache().aset(tips_cache_key(user_id, fingerprint), entry)
+    await GeneratedTips.objects.aupdate_or_create(user_id=user_id, defaults={'fingerprint': fingerprint, **entry})
+    return entry
+
+
+def save_tips_batch(generated):
+    """save_tips() for many users at once; ``generated`` maps user id -> (fingerprint, tips)"""
+    now = timezone.now()
+    rows = [
+        GeneratedTips(user_id=user_id, fingerprint=fingerprint, tips=tips, generated_at=now)
+        for user_id, (fingerprint, tips) in generated.items()
+    ]
+    GeneratedTips.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['fingerprint', 'tips', 'generated_at'],
+    )
+    tips_cache().set_many({
+        tips_cache_key(row.user_id, row.fingerprint): {'tips': row.tips, 'generated_at': now}
+        for row in rows
+    })
+
+
+def spending_summary(snapshot, currency_symbol):
+    """This month's spending figures that the tips prompt is built from"""
+    total_spent = snapshot.current_total
+    expense_count = snapshot.current_count
+    top_categories = snapshot.current_categories[:5]
+
+    # Get category breakdown for detailed analysis
+    category_breakdown = []
+    for cat in top_categories:
+        cat_name = cat['category__name'] or 'Uncategorized'
+        cat_total = float(cat['total'])
+        percentage = (cat_total / float(total_spent) * 100) if total_spent > 0 else 0
+        category_breakdown.append(f"{cat_name}: {currency_symbol}{cat_total:.2f} ({percentage:.1f}%)")
+
+    # Calculate spending trend against last month
+    last_month_total = snapshot.last_month_total
+    spending_change = 0
+    if last_month_total > 0:
+        spending_change = ((float(total_spent) - float(last_month_total)) / float(last_month_total)) * 100
+
+    current_budget = snapshot.budget
+    if current_budget is not None:
+        budget_amount = float(current_budget.amount)
+        budget_remaining = current_budget.get_remaining()
+        budget_percentage = current_budget.get_percentage_used()
+        is_over_budget = current_budget.is_over_budget()
+        budget_info = f"Budget: {currency_symbol}{current_budget.amount:.2f}, Spent: {currency_symbol}{total_spent:.2f}, Remaining: {currency_symbol}{budget_remaining:.2f}, Usage: {budget_percentage:.1f}%"
+        if is_over_budget:
+            budget_info += " (OVER BUDGET)"
+    else:
+        budget_info = "No budget set for this month"
+        budget_amount = None
+        budget_percentage = 0
+        is_over_budget = False
+
+    # Get average transaction amount
+    avg_transaction = float(total_spent) / expense_count if expense_count > 0 else 0
+
+    # Prepare detailed context for AI
+    return {
+        'total_spent': float(total_spent),
+        'expense_count': expense_count,
+        'top_categories': [cat['category__name'] or 'Uncategorized' for cat in top_categories],
+        'category_breakdown': category_breakdown,
+        'budget_info': budget_info,
+        'budget_amount': budget_amount,
+        'last_month_total': float(last_month_total),
+        'spending_change': spending_change,
+        'avg_transaction': avg_transaction,
+        'budget_percentage': budget_percentage,
+        'is_over_budget': is_over_budget,
+    }
+
+
+def user_spending_summary(user):
+    """spending_summary() from the user's shared spending snapshot, plus their
+    currency symbol"""
+    currency_symbol = get_user_currency(user)['symbol']
+    return spending_summary(get_spending_snapshot(user), currency_symbol), currency_symbol
+
+
+async def aspending_summary(user):
+    """Async user_spending_summary()"""
+    return await sync_to_async(user_spending_summary)(user)
+
+
+def build_tips_prompt(spending_summary, currency_symbol):
+    return f"""You are a personal financial advisor analyzing a user's spending data. Provide 4-6 SPECIFIC, PERSONALIZED savings tips based on their actual spending patterns. Make each tip unique and tailored to their situation.
+
+USER'S FINANCIAL DATA:
+- Current Month Spending: {currency_symbol}{spending_summary['total_spent']:.2f}
+- Number of Transactions: {spending_summary['expense_count']}
+- Average Transaction Size: {currency_symbol}{spending_summary['avg_transaction']:.2f}
+- Top Spending Categories: {', '.join(spending_summary['category_breakdown']) if spending_summary['category_breakdown'] else 'No categories yet'}
+- Budget Status: {spending_summary['budget_info']}
+- Last Month Spending: {currency_symbol}{spending_summary['last_month_total']:.2f}
+- Spending Change: {spending_summary['spending_change']:+.1f}% {'increase' if spending_summary['spending_change'] > 0 else 'decrease'} from last month
+
+INSTRUCTIONS:
+1. Analyze their specific spending patterns (which categories they spend most on)
+2. Consider their spending trends (increasing/decreasing)
+3. Provide actionable, specific tips that directly address their spending habits
+4. Reference their actual categories and amounts when relevant
+5. If they're over budget, focus on immediate cost-cutting strategies
+6. If spending increased, suggest ways to reverse the trend
+7. Make tips personal - mention their specific categories or spending patterns
+8. Format as a numbered list (1., 2., 3., etc.)
+9. Each tip should be 2-3 sentences and be SPECIFIC to their data, not generic advice
+
+Generate tips NOW based on this user's unique financial situation:"""
+
+
+def is_tip_line(line):
+    """Whether a stripped line starts a new tip (numbered, bulleted or dashed)"""
+    return len(line) > 2 and (
+        line[0].isdigit() or
+        line.startswith('-') or
+        line.startswith('•') or
+        line.startswith('*') or
+        (line[0].isupper() and '.' in line[:5])
+    )
+
+
+def clean_tip_line(line):
+    """Strip the numbering or bullet from the first line of a tip"""
+    cleaned = line
+    # Remove leading numbers and dots
+    if cleaned[0].isdigit():
+        parts = cleaned.split('.', 1)
+        if len(parts) > 1:
+            cleaned = parts[1].strip()
+    # Remove bullets
+    return cleaned.lstrip('-•* ').strip()
+
+
+class TipStreamParser:
+    """
+    Splits model output into tips as it arrives
+
+    Text can be fed in chunks of any size. A tip is finished as soon as the
+    next one visibly starts, a blank line follows it, or the output ends.
+    Other lines continue the current tip; lines outside a tip are ignored.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self._current = None
+        self._pending = ''
+        # Whether the unfinished line starts a tip; None until it's long
+        # enough to tell
+        self._pending_starts_tip = None
+
+    def feed(self, chunk):
+        """Add output; returns the tips this finished"""
+        self.text += chunk
+        lines = (self._pending + chunk).split('\n')
+        self._pending = lines.pop()
+        finished = []
+        for line in lines:
+            finished.extend(self._end_line(line))
+        finished.extend(self._classify_pending())
+        return finished
+
+    def close(self):
+        """End of output; returns the remaining tips"""
+        finished = self._end_line(self._pending)
+        self._pending = ''
+        if self._current:
+            finished.append(self._current)
+        self._current = None
+        return finished
+
+    @property
+    def in_progress(self):
+        """Text of the tip currently being written, or ''"""
+        pending = self._pending.strip()
+        if self._pending_starts_tip:
+            return clean_tip_line(pending)
+        if self._current is None:
+            return ''
+        if self._pending_starts_tip is False:
+            return f'{self._current} {pending}'
+        return self._current
+
+    def _classify_pending(self):
+        pending = self._pending.strip()
+        if self._pending_starts_tip is not None or len(pending) <= 2:
+            return []
+        self._pending_starts_tip = is_tip_line(pending)
+        if self._pending_starts_tip and self._current:
+            finished, self._current = self._current, None
+            return [finished]
+        return []
+
+    def _end_line(self, line):
+        finished = []
+        line = line.strip()
+        starts_tip = self._pending_starts_tip
+        if starts_tip is None:
+            starts_tip = is_tip_line(line)
+            if starts_tip and self._current:
+                finished.append(self._current)
+        if starts_tip:
+            self._current = clean_tip_line(line) or None
+        elif not line and self._current:
+            # A blank line ends the tip, so closing remarks aren't glued on
+            finished.append(self._current)
+            self._current = None
+        elif line and self._current is not None:
+            self._current += ' ' + line
+        self._pending_starts_tip = None
+        return finished
+
+
+def parse_tips(tips_text):
+    """Split a complete model response into individual tips"""
+    parser = TipStreamParser()
+    tips = parser.feed(tips_text) + parser.close()
+
+    # If parsing failed, try splitting by numbered patterns
+    if not tips:
+        parts = re.split(r'\n\s*\d+[\.\)]\s*', tips_text)
+        tips = [tip.strip() for tip in parts if tip.strip() and len(tip.strip()) > 20]
+
+    # Final fallback
+    return tips or [tips_text]
+
+
+def openai_tips_request(spending_summary, currency_symbol):
+    """Headers and JSON body for an OpenAI chat completion request"""
+    headers = {
+        'Authorization': f"Bearer {os.environ.get('OPENAI_API_KEY')}",
+        'Content-Type': 'application/json'
+    }
+    data = {
+        'model': 'gpt-3.5-turbo',
+        'messages': [
+            {'role': 'system', 'content': SYSTEM_PROMPT},
+            {'role': 'user', 'content': build_tips_prompt(spending_summary, currency_symbol)}
+        ],
+        'max_tokens': 500,
+        'temperature': 0.9  # Higher temperature for more varied, creative responses
+    }
+    return headers, data
+
+
+def request_openai_tips(spending_summary, currency_symbol):
+    """Ask OpenAI for tips; returns the parsed list or raises on failure"""
+    headers, data = openai_tips_request(spending_summary, currency_symbol)
+
+    def post():
+        response = get_session().post(settings.OPENAI_API_URL, headers=headers, json=data, timeout=OPENAI_TIMEOUT)
+        response.raise_for_status()
+        return parse_tips(response.json()['choices'][0]['message']['content'])
+
+    return openai_service.call(filter_fingerprint(data), post)
+
+
+async def arequest_openai_tips(spending_summary, currency_symbol):
+    """Async request_openai_tips(); the event loop stays free while OpenAI responds"""
+    headers, data = openai_tips_request(spending_summary, currency_symbol)
+
+    async def post():
+        async with async_client() as client:
+            response = await client.post(
+                settings.OPENAI_API_URL, headers=headers, json=data, timeout=OPENAI_TIMEOUT
+            )
+        response.raise_for_status()
+        return parse_tips(response.json()['choices'][0]['message']['content'])
+
+    return await openai_service.acall(filter_fingerprint(data), post)
+
+
+class TipBackend:
+    """
+    Source of savings tips, selected by settings.TIPS_BACKEND
+
+    Remote backends are slow and can fail, so their tips are stored per
+    spending fingerprint and only regenerated on request. Local backends
+    are cheap enough to run on every request.
+    """
+    remote = False
+    label = 'Savings Tips'
+
+    def is_available(self):
+        return True
+
+    def generate(self, user_id, spending_summary, currency_symbol):
+        """List of tip strings; may raise if the backend fails"""
+        raise NotImplementedError
+
+    async def agenerate(self, user_id, spending_summary, currency_symbol):
+        return await sync_to_async(self.generate)(user_id, spending_summary, currency_symbol)
+
+    async def astream(self, user_id, spending_summary, currency_symbol):
+        """(finished_tips, in_progress_text) pairs; by default all tips at once"""
+        yield await self.agenerate(user_id, spending_summary, currency_symbol), ''
+
+
+class LocalTipBackend(TipBackend):
+    """Rules-based insights computed from the user's own history (see insights.py)"""
+    label = 'Personalized Savings Tips'
+    min_tips = 4
+
+    def generate(self, user_id, spending_summary, currency_symbol):
+        tips = spending_insights(user_id, spending_summary['budget_amount'], currency_symbol)
+        # Round out a thin history with general advice
+        tips.extend(DEFAULT_TIPS[:max(0, self.min_tips - len(tips))])
+        return tips
+
+
+class OpenAITipBackend(TipBackend):
+    remote = True
+    label = 'AI-Generated Savings Tips'
+
+    def is_available(self):
+        return has_openai_key() and HAS_REQUESTS and HAS_HTTPX
+
+    def generate(self, user_id, spending_summary, currency_symbol):
+        return request_openai_tips(spending_summary, currency_symbol)
+
+    async def agenerate(self, user_id, spending_summary, currency_symbol):
+        return await arequest_openai_tips(spending_summary, currency_symbol)
+
+    def astream(self, user_id, spending_summary, currency_symbol):
+        return astream_openai_tips(spending_summary, currency_symbol)
+
+
+def get_tip_backend():
+    """
+    The configured tips backend, or the local one if it can't be used
+
+    TIPS_BACKEND is a dotted path to a TipBackend subclass, or 'auto' for
+    OpenAI when OPENAI_API_KEY is set and the local engine otherwise.
+    """
+    if settings.TIPS_BACKEND == 'auto':
+        backend = OpenAITipBackend()
+    else:
+        backend = import_string(settings.TIPS_BACKEND)()
+    return backend if backend.is_available() else LocalTipBackend()
+
+
+def _fresh_result(tips):
+    return {
+        'tips': tips,
+        'error_message': None,
+        'generated_at': timezone.now(),
+        'cached': False,
+    }
+
+
+def _failure_result(error, entry, fallback_tips):
+    # Keep serving the previous tips for this spending if we have them
+    if entry is not None:
+        return {**entry, 'error_message': 'Unable to regenerate tips right now. Showing your previous tips.', 'cached': True}
+    return {
+        **_fresh_result(fallback_tips),
+        'error_message': f"AI service temporarily unavailable: {str(error)}. Showing tips based on your recent spending instead.",
+    }
+
+
+def get_savings_tips(user_id, spending_summary, currency_symbol, regenerate=False):
+    """
+    Tips for a user's current spending from the configured backend
+
+    Returns a dict with ``tips``, ``error_message``, ``generated_at`` and
+    ``cached`` (whether stored tips were served).
+    """
+    backend = get_tip_backend()
+    if not backend.remote:
+        return _fresh_result(backend.generate(user_id, spending_summary, currency_symbol))
+
+    fingerprint = tips_fingerprint(spending_summary, currency_symbol)
+    entry = load_tips(user_id, fingerprint)
+    if entry is not None and not regenerate:
+        return {**entry, 'error_message': None, 'cached': True}
+
+    try:
+        tips = backend.generate(user_id, spending_summary, currency_symbol)
+    except Exception as e:
+        fallback = None if entry is not None else LocalTipBackend().generate(user_id, spending_summary, currency_symbol)
+        return _failure_result(e, entry, fallback)
+
+    entry = save_tips(user_id, fingerprint, tips)
+    return {**entry, 'error_message': None, 'cached': False}
+
+
+async def aget_savings_tips(user_id, spending_summary, currency_symbol, regenerate=False):
+    """Async get_savings_tips()"""
+    backend = get_tip_backend()
+    if not backend.remote:
+        return _fresh_result(await backend.agenerate(user_id, spending_summary, currency_symbol))
+
+    fingerprint = tips_fingerprint(spending_summary, currency_symbol)
+    entry = await aload_tips(user_id, fingerprint)
+    if entry is not None and not regenerate:
+        return {**entry, 'error_message': None, 'cached': True}
+
+    try:
+        tips = await backend.agenerate(user_id, spending_summary, currency_symbol)
+    except Exception as e:
+        fallback = None if entry is not None else await LocalTipBackend().agenerate(user_id, spending_summary, currency_symbol)
+        return _failure_result(e, entry, fallback)
+
+    entry = await asave_tips(user_id, fingerprint, tips)
+    return {**entry, 'error_message': None, 'cached': False}
+
+
+async def astream_openai_tips(spending_summary, currency_symbol):
+    """
+    Stream OpenAI's answer, yielding (finished_tips, in_progress_text) pairs
+
+    Tip boundaries are found incrementally, so each tip is yielded as soon as
+    the model moves on to the next one.
+    """
+    headers, data = openai_tips_request(spending_summary, currency_symbol)
+    parser = TipStreamParser()
+    tip_count = 0
+    # A stream can't be shared between callers, so it only goes through the breaker
+    openai_service.before_call()
+    try:
+        async with async_client() as client, client.stream(
+            'POST', settings.OPENAI_API_URL, headers=headers, json={**data, 'stream': True},
+            timeout=OPENAI_TIMEOUT,
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith('data:'):
+                    continue
+                payload = line[len('data:'):].strip()
+                if payload == '[DONE]':
+                    break
+                delta = json.loads(payload)['choices'][0]['delta'].get('content')
+                if delta:
+                    finished = parser.feed(delta)
+                    tip_count += len(finished)
+                    yield finished, parser.in_progress
+    except Exception:
+        openai_service.record_failure()
+        raise
+    except BaseException:
+        # The client went away; that says nothing about OpenAI
+        openai_service.breaker.record_abandoned()
+        raise
+    openai_service.record_success()
+
+    finished = parser.close()
+    if not tip_count and not finished:
+        # Nothing looked like a list; fall back to the whole-response parser
+        finished = parse_tips(parser.text)
+    yield finished, ''
+
+
+def _done_event(generated_at, cached, error_message=None):
+    return ('done', {
+        'tips_generated_at': generated_at.strftime('%H:%M:%S'),
+        'tips_generated_at_iso': generated_at.isoformat(),
+        'cached': cached,
+        'error_message': error_message,
+    })
+
+
+async def astream_savings_tips(user_id, spending_summary, currency_symbol, regenerate=False):
+    """
+    Stream tips for a user's current spending as (event, data) pairs
+
+    Events are 'partial' (the tip being written so far), 'tip' (a finished
+    tip) and a final 'done'. Local, stored and fallback tips are sent as
+    'tip' events straight away. Streamed tips are stored once complete, just
+    like get_savings_tips().
+    """
+    backend = get_tip_backend()
+    if not backend.remote:
+        result = _fresh_result(await backend.agenerate(user_id, spending_summary, currency_symbol))
+        for index, tip in enumerate(result['tips']):
+            yield 'tip', {'index': index, 'text': tip}
+        yield _done_event(result['generated_at'], cached=False)
+        return
+
+    fingerprint = tips_fingerprint(spending_summary, currency_symbol)
+    entry = await aload_tips(user_id, fingerprint)
+    if entry is not None and not regenerate:
+        for index, tip in enumerate(entry['tips']):
+            yield 'tip', {'index': index, 'text': tip}
+        yield _done_event(entry['generated_at'], cached=True)
+        return
+
+    tips = []
+    try:
+        async for finished, in_progress in backend.astream(user_id, spending_summary, currency_symbol):
+            for tip in finished:
+                yield 'tip', {'index': len(tips), 'text': tip}
+                tips.append(tip)
+            if in_progress:
+                yield 'partial', {'index': len(tips), 'text': in_progress}
+    except Exception as e:
+        if tips:
+            # Keep what already arrived, but don't store a partial answer
+            yield _done_event(timezone.now(), cached=False, error_message='The AI service stopped responding. Some tips may be missing.')
+            return
+        fallback = None if entry is not None else await LocalTipBackend().agenerate(user_id, spending_summary, currency_symbol)
+        result = _failure_result(e, entry, fallback)
+        for index, tip in enumerate(result['tips']):
+            yield 'tip', {'index': index, 'text': tip}
+        yield _done_event(result['generated_at'], result['cached'], result['error_message'])
+        return
+
+    entry = await asave_tips(user_id, fingerprint, tips)
+    yield _done_event(entry['generated_at'], cached=False)
@@ -14,6 +14,7 @@ urlpatterns = [
     
     # Expenses
     path('expenses/', views.expense_list_view, name='expense_list'),
+    path('expenses/rows/', views.expense_rows_view, name='expense_rows'),
     path('expenses/add/', views.expense_create_view, name='expense_create'),
     path('expenses/<int:pk>/edit/', views.expense_edit_view, name='expense_edit'),
     path('expenses/<int:pk>/delete/', views.expense_delete_view, name='expense_delete'),
@@ -28,9 +29,14 @@ urlpatterns = [
     # Export
     path('export/csv/', views.export_csv_view, name='export_csv'),
     path('export/pdf/', views.export_pdf_view, name='export_pdf'),
+    path('export/jobs/', views.export_job_create_view, name='export_job_create'),
+    path('export/jobs/<int:pk>/', views.export_job_status_view, name='export_job_status'),
+    path('export/jobs/<int:pk>/download/', views.export_job_download_view, name='export_job_download'),
     
     # Smart Features
     path('ai-tips/', views.ai_tips_view, name='ai_tips'),
+    path('ai-tips/stream/', views.ai_tips_stream_view, name='ai_tips_stream'),
+    path('status/outbound/', views.outbound_status_view, name='outbound_status'),
     path('articles/', views.articles_view, name='articles'),
     path('articles/add/', views.article_create_view, name='article_create'),
     path('articles/<int:pk>/', views.article_detail_view, name='article_detail'),
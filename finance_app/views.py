@@ -1,31 +1,61 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
+from django.contrib.messages import get_messages
 from django.db.models import Sum, Count, Q
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse, FileResponse, Http404
+from django.urls import reverse
+from django.core.cache import cache
+from urllib.parse import urlencode
+from django.utils.cache import patch_cache_control
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
 from django.utils import timezone
-from datetime import datetime, timedelta
+from asgiref.sync import sync_to_async
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-import csv
 import json
-import os
-import re
-try:
-    import requests
-    HAS_REQUESTS = True
-except ImportError:
-    HAS_REQUESTS = False
-
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-
-from .models import Expense, Budget, Category, Goal, Article, UserProfile
+
+from .models import Expense, Budget, Goal, Article, UserProfile, ExportJob
 from .forms import SignUpForm, ExpenseForm, BudgetForm, ExpenseFilterForm, GoalForm, ArticleForm
-from .currency_utils import format_currency, get_user_currency
+from .currency_utils import get_currency_formatter
+from .cache_utils import user_cache_key, filter_fingerprint, get_category_version, get_data_version, get_or_revalidate
+from .counters import record_article_view, live_view_count
+from .category_cache import attach_categories, get_categories
+from .date_utils import last_n_months
+from .exports import iter_expense_csv, write_expense_pdf, export_fingerprint
+from .pagination import paginate_expenses
+from .outbound import outbound_metrics
+from .search import search_articles
+from .spending import get_spending_snapshot
+from .tips import aget_savings_tips, aspending_summary, astream_savings_tips, get_tip_backend
+
+# Upper bound for the reports ?months= window
+MAX_REPORT_MONTHS = 120
+
+# How long filtered expense totals stay cached (writes invalidate them sooner)
+EXPENSE_TOTALS_CACHE_SECONDS = 300
+
+# How long an unchanged dashboard stays cached (writes invalidate it sooner)
+DASHBOARD_CACHE_SECONDS = 60 * 60 * 24
+
+
+def user_data_etag(request, *args, **kwargs):
+    """ETag for a page rendered only from the user's own data (None while messages are pending)"""
+    user = request.user
+    if not user.is_authenticated or len(get_messages(request)):
+        return None
+    return filter_fingerprint({
+        'user': user.pk,
+        'data_version': get_data_version(user),
+        'category_version': get_category_version(),
+        'today': timezone.localdate(),
+        'currency': [request.currency['code'], request.currency['symbol']],
+        'csrf': request.META.get('CSRF_COOKIE'),
+        'path': request.get_full_path(),
+    })
 
 
 def signup_view(request):
@@ -56,31 +86,24 @@ def signup_view(request):
     return render(request, 'finance_app/signup.html', {'form': form})
 
 
-@login_required
-def dashboard_view(request):
-    """Main dashboard with statistics"""
-    user = request.user
-    now = timezone.now()
-    current_month = now.month
-    current_year = now.year
-    
-    # Get current month budget
-    try:
-        current_budget = Budget.objects.get(user=user, month=current_month, year=current_year)
-    except Budget.DoesNotExist:
-        current_budget = None
-    
-    # Current month expenses
-    current_month_expenses = Expense.objects.filter(
-        user=user,
-        date__year=current_year,
-        date__month=current_month
-    )
-    
-    total_expenses = current_month_expenses.aggregate(Sum('amount'))['amount__sum'] or 0
-    expense_count = current_month_expenses.count()
-    
-    # Budget calculations
+def _dashboard_context(user, today):
+    """Statistics shown on the dashboard"""
+    # Month totals, category breakdown and budget usage come from the shared
+    # spending snapshot (cached until the user's expenses or budgets change)
+    snapshot = get_spending_snapshot(user)
+    current_budget = snapshot.budget
+    total_expenses = snapshot.current_total
+    expense_count = snapshot.current_count
+    category_data = snapshot.current_categories
+    
+    # Last 6 calendar months, oldest first
+    month_totals = snapshot.month_totals()
+    monthly_trends = [
+        {'month': date(year, month, 1).strftime('%b %Y'), 'amount': float(month_totals[(year, month)])}
+        for year, month in last_n_months(6, today)
+    ]
+    
+    # Budget calculations (annotated by with_spending)
     remaining_budget = 0
     budget_percentage = 0
     is_over_budget = False
@@ -90,35 +113,15 @@ def dashboard_view(request):
         is_over_budget = current_budget.is_over_budget()
     
     # Recent expenses (last 5)
-    recent_expenses = Expense.objects.filter(user=user).order_by('-date', '-created_at')[:5]
-    
-    # Category breakdown for current month
-    category_data = list(current_month_expenses.values('category__name').annotate(
-        total=Sum('amount'),
-        count=Count('id')
-    ).order_by('-total'))
-    
-    # Monthly trend (last 6 months)
-    monthly_trends = []
-    for i in range(5, -1, -1):
-        month_date = now - timedelta(days=30*i)
-        month_expenses = Expense.objects.filter(
-            user=user,
-            date__year=month_date.year,
-            date__month=month_date.month
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-        monthly_trends.append({
-            'month': month_date.strftime('%b %Y'),
-            'amount': float(month_expenses)
-        })
+    recent_expenses = attach_categories(Expense.objects.filter(user=user).order_by('-date', '-created_at')[:5])
     
     # Upcoming bills (expenses in next 7 days)
-    upcoming_date = now.date() + timedelta(days=7)
-    upcoming_expenses = Expense.objects.filter(
+    upcoming_date = today + timedelta(days=7)
+    upcoming_expenses = attach_categories(Expense.objects.filter(
         user=user,
-        date__gte=now.date(),
+        date__gte=today,
         date__lte=upcoming_date
-    ).order_by('date')[:5]
+    ).order_by('date')[:5])
     
     # Convert Decimal totals for JSON
     category_data_list = []
@@ -142,50 +145,94 @@ def dashboard_view(request):
         'category_data_json': json.dumps(category_data_list),
         'upcoming_expenses': upcoming_expenses,
     }
-    return render(request, 'finance_app/dashboard.html', context)
+    return context
 
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=user_data_etag)
+def dashboard_view(request):
+    """Main dashboard with statistics"""
+    user = request.user
+    today = timezone.localdate()
+    
+    # The whole context is cached per user until their expenses, budgets or
+    # goals change, a category is edited, or the day rolls over; after a
+    # change one request rebuilds it while concurrent ones get the previous copy
+    context, current = get_or_revalidate(
+        f'finance_app:dashboard:{user.pk}',
+        (get_data_version(user), get_category_version(), today.isoformat()),
+        lambda: _dashboard_context(user, today),
+        DASHBOARD_CACHE_SECONDS,
+    )
+    response = render(request, 'finance_app/dashboard.html', context)
+    if not current:
+        # The ETag describes the current version; don't let the browser keep
+        # the previous copy under it
+        patch_cache_control(response, no_store=True)
+    return response
+
+
+def _expense_list_page(request):
+    """Filter form, one keyset page of expenses and the next-page cursor for the expense list"""
+    form = ExpenseFilterForm(request.GET)
+    expenses = form.filter_queryset(Expense.objects.filter(user=request.user))
+    page, next_cursor = paginate_expenses(expenses, request.GET.get('cursor'))
+    return form, expenses, attach_categories(page), next_cursor
+
+
+def _filter_params(request, form):
+    """The submitted (valid) filter parameters, without the pagination cursor"""
+    if not form.is_valid():
+        return {}
+    return {
+        name: request.GET[name]
+        for name in ExpenseFilterForm.base_fields
+        if request.GET.get(name)
+    }
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=user_data_etag)
 def expense_list_view(request):
-    """List all expenses with filters"""
+    """List expenses with filters, one keyset page at a time"""
     user = request.user
-    expenses = Expense.objects.filter(user=user).order_by('-date', '-created_at')
+    form, expenses, page, next_cursor = _expense_list_page(request)
+    filter_params = _filter_params(request, form)
     
-    # Apply filters
-    form = ExpenseFilterForm(request.GET)
-    if form.is_valid():
-        category = form.cleaned_data.get('category')
-        start_date = form.cleaned_data.get('start_date')
-        end_date = form.cleaned_data.get('end_date')
-        min_amount = form.cleaned_data.get('min_amount')
-        max_amount = form.cleaned_data.get('max_amount')
-        
-        if category:
-            expenses = expenses.filter(category=category)
-        if start_date:
-            expenses = expenses.filter(date__gte=start_date)
-        if end_date:
-            expenses = expenses.filter(date__lte=end_date)
-        if min_amount:
-            expenses = expenses.filter(amount__gte=min_amount)
-        if max_amount:
-            expenses = expenses.filter(amount__lte=max_amount)
-    
-    # Calculate total
-    total_amount = expenses.aggregate(Sum('amount'))['amount__sum'] or 0
+    # Total and count for the whole filtered set, cached per filter fingerprint
+    # until the user's expenses change
+    totals_key = user_cache_key(user, 'expense_totals', filter_fingerprint(filter_params))
+    totals = cache.get(totals_key)
+    if totals is None:
+        totals = expenses.aggregate(total=Sum('amount'), count=Count('id'))
+        cache.set(totals_key, totals, EXPENSE_TOTALS_CACHE_SECONDS)
     
     # Get categories for modal
-    categories = Category.objects.all().order_by('name')
+    categories = get_categories()
     
     context = {
-        'expenses': expenses,
+        'expenses': page,
+        'next_cursor': next_cursor,
+        'filter_query': urlencode(filter_params),
         'form': form,
-        'total_amount': total_amount,
+        'total_amount': totals['total'] or 0,
+        'total_count': totals['count'],
         'categories': categories,
     }
     return render(request, 'finance_app/expense_list.html', context)
 
 
+@login_required
+def expense_rows_view(request):
+    """Next page of expense rows (HTML fragment) for infinite scroll"""
+    form, expenses, page, next_cursor = _expense_list_page(request)
+    response = render(request, 'finance_app/expense_rows.html', {'expenses': page})
+    response['X-Next-Cursor'] = next_cursor or ''
+    return response
+
+
 @login_required
 def expense_create_view(request):
     """Create new expense"""
@@ -231,12 +278,7 @@ def expense_delete_view(request, pk):
 @login_required
 def budget_list_view(request):
     """List all budgets"""
-    budgets = Budget.objects.filter(user=request.user).order_by('-year', '-month')
-    for budget in budgets:
-        budget.total_expenses = budget.get_total_expenses()
-        budget.remaining = budget.get_remaining()
-        budget.percentage = budget.get_percentage_used()
-        budget.is_over = budget.is_over_budget()
+    budgets = Budget.objects.with_spending().filter(user=request.user).order_by('-year', '-month')
     return render(request, 'finance_app/budget_list.html', {'budgets': budgets})
 
 
@@ -263,41 +305,43 @@ def budget_create_view(request):
 
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=user_data_etag)
 def reports_view(request):
     """Reports and analytics page"""
     user = request.user
-    now = timezone.now()
-    
-    # Get date range (default: last 6 months)
-    months_back = int(request.GET.get('months', 6))
-    start_date = now - timedelta(days=30*months_back)
     
-    expenses = Expense.objects.filter(user=user, date__gte=start_date.date())
+    # Get date range (default: last 6 calendar months, including the current one)
+    try:
+        months_back = int(request.GET.get('months', 6))
+    except ValueError:
+        months_back = 6
+    months_back = min(max(1, months_back), MAX_REPORT_MONTHS)
+    window = last_n_months(months_back)
+    
+    # The shared spending snapshot (one grouped rollup query, cached until
+    # the user's data changes) feeds every chart and KPI on the page
+    snapshot = get_spending_snapshot(user, months_back)
+    month_totals = snapshot.month_totals()
+    monthly_data = {key: float(month_totals[key]) for key in window}
     
     # Category distribution (pie chart data)
-    category_dist = expenses.values('category__name', 'category__icon').annotate(
-        total=Sum('amount')
-    ).order_by('-total')
-    
-    # Monthly trend (line chart data)
-    monthly_data = {}
-    for expense in expenses:
-        key = expense.date.strftime('%Y-%m')
-        if key not in monthly_data:
-            monthly_data[key] = 0
-        monthly_data[key] += float(expense.amount)
+    category_dist_list = [
+        {'category__name': name, 'category__icon': icon, 'total': float(total)}
+        for (name, icon), total in snapshot.category_totals(months_back)
+    ]
     
-    monthly_trend = [{'month': k, 'amount': v} for k, v in sorted(monthly_data.items())]
+    # Monthly trend (line chart data), including months without spending
+    monthly_trend = [
+        {'month': f"{year:04d}-{month:02d}", 'amount': monthly_data.get((year, month), 0)}
+        for year, month in window
+    ]
     
     # Category comparison (bar chart data)
-    category_comparison = list(category_dist.values('category__name', 'total'))
-    
-    # Convert Decimals to floats for JSON serialization
-    category_dist_list = list(category_dist)
-    for item in category_dist_list:
-        item['total'] = float(item['total'] or 0)
-    for item in category_comparison:
-        item['total'] = float(item['total'] or 0)
+    category_comparison = [
+        {'category__name': item['category__name'], 'total': item['total']}
+        for item in category_dist_list
+    ]
     
     # Serialize data for JavaScript
     category_dist_json = json.dumps(category_dist_list)
@@ -305,16 +349,15 @@ def reports_view(request):
     category_comparison_json = json.dumps(category_comparison)
     
     # High-level KPIs
-    total_spend = float(expenses.aggregate(Sum('amount'))['amount__sum'] or 0)
-    months_in_range = max(1, len(monthly_data.keys()))
-    average_monthly = total_spend / months_in_range
+    total_spend = sum(monthly_data.values())
+    average_monthly = total_spend / len(window)
     top_category = None
     if category_dist_list:
         top_item = category_dist_list[0]
         top_category = {
             'name': top_item.get('category__name') or 'Uncategorized',
-            'icon': top_item.get('category__icon', ''),
-            'total': float(top_item.get('total') or 0),
+            'icon': top_item.get('category__icon') or '',
+            'total': top_item.get('total'),
         }
     
     context = {
@@ -334,381 +377,181 @@ def reports_view(request):
 
 @login_required
 def export_csv_view(request):
-    """Export expenses to CSV"""
+    """Export expenses to CSV (streamed, honouring the expense list filters)"""
     user = request.user
     expenses = Expense.objects.filter(user=user).order_by('-date', '-created_at')
+    expenses = ExpenseFilterForm(request.GET).filter_queryset(expenses)
     
-    # Get user's currency
-    currency_info = get_user_currency(user)
-    currency_symbol = currency_info['symbol']
+    # Get user's currency formatter (currency resolved once per request by CurrencyMiddleware)
+    formatter = get_currency_formatter(request.currency['code'], request.currency['symbol'])
     
-    response = HttpResponse(content_type='text/csv')
+    response = StreamingHttpResponse(iter_expense_csv(expenses, formatter), content_type='text/csv')
     response['Content-Disposition'] = f'attachment; filename="expenses_{user.username}_{timezone.now().strftime("%Y%m%d")}.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow(['Date', 'Title', 'Category', 'Amount', 'Description'])
-    
-    for expense in expenses:
-        # Format amount with user's currency
-        formatted_amount = format_currency(expense.amount, currency_symbol)
-        writer.writerow([
-            expense.date.strftime('%Y-%m-%d'),
-            expense.title,
-            expense.category.name if expense.category else 'N/A',
-            formatted_amount,
-            expense.description
-        ])
-    
     return response
 
 
 @login_required
 def export_pdf_view(request):
-    """Export expenses to PDF"""
+    """Export expenses to PDF (honours the expense list filters, e.g. a date range)"""
     user = request.user
     expenses = Expense.objects.filter(user=user).order_by('-date', '-created_at')
+    expenses = ExpenseFilterForm(request.GET).filter_queryset(expenses)
     
-    # Get user's currency
-    currency_info = get_user_currency(user)
-    currency_symbol = currency_info['symbol']
+    # Get user's currency formatter (currency resolved once per request by CurrencyMiddleware)
+    formatter = get_currency_formatter(request.currency['code'], request.currency['symbol'])
     
     response = HttpResponse(content_type='application/pdf')
     response['Content-Disposition'] = f'attachment; filename="expenses_{user.username}_{timezone.now().strftime("%Y%m%d")}.pdf"'
     
-    doc = SimpleDocTemplate(response, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Title
-    title = Paragraph(f"Expense Report - {user.username}", styles['Title'])
-    elements.append(title)
-    elements.append(Spacer(1, 0.2*inch))
-    
     # Summary
-    total = expenses.aggregate(Sum('amount'))['amount__sum'] or 0
-    formatted_total = format_currency(total, currency_symbol)
-    summary = Paragraph(f"Total Expenses: {formatted_total} | Count: {expenses.count()}", styles['Normal'])
-    elements.append(summary)
-    elements.append(Spacer(1, 0.2*inch))
-    
-    # Table data
-    data = [['Date', 'Title', 'Category', 'Amount']]
-    for expense in expenses:
-        # Format amount with user's currency
-        formatted_amount = format_currency(expense.amount, currency_symbol)
-        data.append([
-            expense.date.strftime('%Y-%m-%d'),
-            expense.title,
-            expense.category.name if expense.category else 'N/A',
-            formatted_amount
-        ])
-    
-    table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-    ]))
-    
-    elements.append(table)
-    doc.build(elements)
+    totals = expenses.aggregate(total=Sum('amount'), count=Count('id'))
+    summary = f"Total Expenses: {formatter.format(totals['total'] or 0)} | Count: {totals['count']}"
     
+    write_expense_pdf(response, expenses, formatter, f"Expense Report - {user.username}", summary)
     return response
 
 
+def _export_job_payload(job):
+    """JSON description of an export job for status polling"""
+    payload = {
+        'id': job.pk,
+        'format': job.format,
+        'status': job.status,
+        'progress': job.progress,
+        'total_rows': job.total_rows,
+        'status_url': reverse('export_job_status', args=[job.pk]),
+        'download_url': None,
+        'error': job.error or None,
+    }
+    if job.status == 'completed':
+        payload['download_url'] = reverse('export_job_download', args=[job.pk])
+    return payload
+
+
 @login_required
-def ai_tips_view(request):
-    """AI-powered savings tips based on user's spending patterns"""
-    user = request.user
-    now = timezone.now()
-    
-    # Get user's spending data for context
-    current_month_expenses = Expense.objects.filter(
-        user=user,
-        date__year=now.year,
-        date__month=now.month
-    )
-    
-    total_spent = current_month_expenses.aggregate(Sum('amount'))['amount__sum'] or 0
-    expense_count = current_month_expenses.count()
-    
-    # Get top spending categories with amounts
-    top_categories = current_month_expenses.values('category__name').annotate(
-        total=Sum('amount')
-    ).order_by('-total')[:5]
-    
-    # Get user currency for category breakdown
-    from .currency_utils import get_user_currency
-    currency_info = get_user_currency(user)
-    currency_symbol = currency_info['symbol']
-    
-    # Get category breakdown for detailed analysis
-    category_breakdown = []
-    for cat in top_categories:
-        cat_name = cat['category__name'] or 'Uncategorized'
-        cat_total = float(cat['total'])
-        percentage = (cat_total / float(total_spent) * 100) if total_spent > 0 else 0
-        category_breakdown.append(f"{cat_name}: {currency_symbol}{cat_total:.2f} ({percentage:.1f}%)")
-    
-    # Get last month's spending for comparison
-    last_month = now.month - 1
-    last_month_year = now.year
-    if last_month == 0:
-        last_month = 12
-        last_month_year = now.year - 1
-    else:
-        last_month_year = now.year
-    
-    last_month_expenses = Expense.objects.filter(
-        user=user,
-        date__year=last_month_year,
-        date__month=last_month
-    )
-    last_month_total = last_month_expenses.aggregate(Sum('amount'))['amount__sum'] or 0
-    
-    # Calculate spending trend
-    spending_change = 0
-    if last_month_total > 0:
-        spending_change = ((float(total_spent) - float(last_month_total)) / float(last_month_total)) * 100
-    
-    # Get current budget if exists
-    try:
-        current_budget = Budget.objects.get(user=user, month=now.month, year=now.year)
-        budget_remaining = current_budget.get_remaining()
-        budget_percentage = current_budget.get_percentage_used()
-        is_over_budget = current_budget.is_over_budget()
-        budget_info = f"Budget: {currency_symbol}{current_budget.amount:.2f}, Spent: {currency_symbol}{total_spent:.2f}, Remaining: {currency_symbol}{budget_remaining:.2f}, Usage: {budget_percentage:.1f}%"
-        if is_over_budget:
-            budget_info += " (OVER BUDGET)"
-    except Budget.DoesNotExist:
-        budget_info = "No budget set for this month"
-        budget_percentage = 0
-        is_over_budget = False
-    
-    # Get average transaction amount
-    avg_transaction = float(total_spent) / expense_count if expense_count > 0 else 0
-    
-    # Prepare detailed context for AI
-    spending_summary = {
-        'total_spent': float(total_spent),
-        'expense_count': expense_count,
-        'top_categories': [cat['category__name'] or 'Uncategorized' for cat in top_categories],
-        'category_breakdown': category_breakdown,
-        'budget_info': budget_info,
-        'last_month_total': float(last_month_total),
-        'spending_change': spending_change,
-        'avg_transaction': avg_transaction,
-        'budget_percentage': budget_percentage,
-        'is_over_budget': is_over_budget,
+@require_POST
+def export_job_create_view(request):
+    """Queue a background export, or reuse an existing job for an unchanged dataset"""
+    export_format = request.POST.get('format', 'csv')
+    if export_format not in dict(ExportJob.FORMAT_CHOICES):
+        return JsonResponse({'error': 'Unsupported export format'}, status=400)
+    filters = {
+        name: request.POST[name]
+        for name in ExpenseFilterForm.base_fields
+        if request.POST.get(name)
     }
     
-    # Get AI tips (optional - requires OpenAI API key)
-    # Always generate fresh tips on each request for real-time updates
-    ai_tips = []
-    error_message = None
+    fingerprint = export_fingerprint(request.user, export_format, filters, request.currency)
+    job = ExportJob.objects.filter(
+        user=request.user,
+        fingerprint=fingerprint,
+    ).exclude(status='failed').first()
+    if job is None or (job.status == 'completed' and not job.has_artifact()):
+        job = ExportJob.objects.create(
+            user=request.user,
+            format=export_format,
+            filters=filters,
+            fingerprint=fingerprint,
+        )
     
-    openai_api_key = os.environ.get('OPENAI_API_KEY')
-    if openai_api_key and HAS_REQUESTS:
-        try:
-            # Prepare detailed, personalized prompt
-            prompt = f"""You are a personal financial advisor analyzing a user's spending data. Provide 4-6 SPECIFIC, PERSONALIZED savings tips based on their actual spending patterns. Make each tip unique and tailored to their situation.
-
-USER'S FINANCIAL DATA:
-- Current Month Spending: {currency_symbol}{spending_summary['total_spent']:.2f}
-- Number of Transactions: {spending_summary['expense_count']}
-- Average Transaction Size: {currency_symbol}{spending_summary['avg_transaction']:.2f}
-- Top Spending Categories: {', '.join(spending_summary['category_breakdown']) if spending_summary['category_breakdown'] else 'No categories yet'}
-- Budget Status: {spending_summary['budget_info']}
-- Last Month Spending: {currency_symbol}{spending_summary['last_month_total']:.2f}
-- Spending Change: {spending_summary['spending_change']:+.1f}% {'increase' if spending_summary['spending_change'] > 0 else 'decrease'} from last month
-
-INSTRUCTIONS:
-1. Analyze their specific spending patterns (which categories they spend most on)
-2. Consider their spending trends (increasing/decreasing)
-3. Provide actionable, specific tips that directly address their spending habits
-4. Reference their actual categories and amounts when relevant
-5. If they're over budget, focus on immediate cost-cutting strategies
-6. If spending increased, suggest ways to reverse the trend
-7. Make tips personal - mention their specific categories or spending patterns
-8. Format as a numbered list (1., 2., 3., etc.)
-9. Each tip should be 2-3 sentences and be SPECIFIC to their data, not generic advice
-
-Generate tips NOW based on this user's unique financial situation:"""
-            
-            # Call OpenAI API
-            headers = {
-                'Authorization': f'Bearer {openai_api_key}',
-                'Content-Type': 'application/json'
-            }
-            data = {
-                'model': 'gpt-3.5-turbo',
-                'messages': [
-                    {'role': 'system', 'content': 'You are an expert personal financial advisor. You analyze spending data and provide SPECIFIC, PERSONALIZED savings tips tailored to each individual\'s unique spending patterns. Never give generic advice - always reference the user\'s actual data.'},
-                    {'role': 'user', 'content': prompt}
-                ],
-                'max_tokens': 500,
-                'temperature': 0.9  # Higher temperature for more varied, creative responses
-            }
-            
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers=headers,
-                json=data,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                tips_text = result['choices'][0]['message']['content']
-                # Parse tips into list - handle various formats
-                ai_tips = []
-                for line in tips_text.split('\n'):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    # Check if line starts with number, bullet, or dash
-                    if (line and len(line) > 2 and 
-                        (line[0].isdigit() or 
-                         line.startswith('-') or 
-                         line.startswith('•') or
-                         line.startswith('*') or
-                         (line[0].isupper() and '.' in line[:5]))):
-                        # Remove numbering/bullets and clean
-                        cleaned = line
-                        # Remove leading numbers and dots
-                        if cleaned[0].isdigit():
-                            parts = cleaned.split('.', 1)
-                            if len(parts) > 1:
-                                cleaned = parts[1].strip()
-                        # Remove bullets
-                        cleaned = cleaned.lstrip('-•* ').strip()
-                        if cleaned:
-                            ai_tips.append(cleaned)
-                
-                # If parsing failed, try splitting by common patterns
-                if not ai_tips:
-                    # Try splitting by numbered patterns
-                    tips = re.split(r'\n\s*\d+[\.\)]\s*', tips_text)
-                    ai_tips = [tip.strip() for tip in tips if tip.strip() and len(tip.strip()) > 20]
-                
-                # Final fallback
-                if not ai_tips:
-                    ai_tips = [tips_text]  # Fallback to full text
-            else:
-                error_message = "Unable to fetch AI tips. Please try again later."
-        except Exception as e:
-            error_message = f"AI service temporarily unavailable: {str(e)}. Using default tips."
-            # Fallback tips
-            ai_tips = [
-                "Track your spending daily to identify unnecessary expenses.",
-                "Set up automatic transfers to a savings account each payday.",
-                "Review subscriptions monthly and cancel unused services.",
-                "Use the 24-hour rule: wait a day before making non-essential purchases.",
-                "Cook at home more often - it's healthier and cheaper than eating out."
-            ]
-    else:
-        # Default tips when API key is not available
-        ai_tips = [
-            "Track your spending daily to identify unnecessary expenses.",
-            "Set up automatic transfers to a savings account each payday.",
-            "Review subscriptions monthly and cancel unused services.",
-            "Use the 24-hour rule: wait a day before making non-essential purchases.",
-            "Cook at home more often - it's healthier and cheaper than eating out.",
-            "Compare prices before making large purchases.",
-            "Build an emergency fund covering 3-6 months of expenses."
-        ]
-    
-    # Get current timestamp for tips generation
-    tips_generated_at = timezone.now()
+    return JsonResponse(_export_job_payload(job), status=200 if job.status == 'completed' else 202)
+
+
+@login_required
+def export_job_status_view(request, pk):
+    """Report an export job's status and progress"""
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user)
+    return JsonResponse(_export_job_payload(job))
+
+
+@login_required
+def export_job_download_view(request, pk):
+    """Serve a finished export artifact"""
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user, status='completed')
+    job.user = request.user
+    try:
+        artifact = job.artifact.storage.open(job.artifact.name) if job.artifact else None
+    except FileNotFoundError:
+        artifact = None
+    if artifact is None:
+        raise Http404("Export file is no longer available")
+    response = FileResponse(artifact, as_attachment=True, filename=job.filename)
+    response['Content-Length'] = artifact.size
+    return response
+
+
+@login_required
+async def ai_tips_view(request):
+    """AI-powered savings tips based on user's spending patterns"""
+    # Resolve the user once so request.user in sync code (context processors,
+    # request.currency) reuses it instead of querying again
+    request.user = user = await request.auser()
+    spending_summary, currency_symbol = await aspending_summary(user)
+    
+    # Tips come from the configured backend (OpenAI or the local insight
+    # engine). OpenAI tips are stored per spending fingerprint; ?regenerate=1
+    # asks for a fresh set
+    regenerate = request.GET.get('regenerate') == '1'
+    result = await aget_savings_tips(user.id, spending_summary, currency_symbol, regenerate=regenerate)
+    ai_tips = result['tips']
+    error_message = result['error_message']
+    tips_generated_at = result['generated_at']
     
     context = {
         'ai_tips': ai_tips,
         'spending_summary': spending_summary,
         'error_message': error_message,
-        'has_api_key': bool(openai_api_key),
+        'tips_backend': get_tip_backend(),
         'tips_generated_at': tips_generated_at,
+        'tips_cached': result['cached'],
     }
     
     # Check if this is an AJAX request for real-time refresh
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         # Return JSON for AJAX requests
-        return JsonResponse({
+        response = JsonResponse({
             'ai_tips': ai_tips,
             'spending_summary': spending_summary,
             'error_message': error_message,
             'tips_generated_at': tips_generated_at.strftime('%H:%M:%S'),
             'tips_generated_at_iso': tips_generated_at.isoformat(),
+            'cached': result['cached'],
         })
-    
-    response = render(request, 'finance_app/ai_tips.html', context)
-    # Add cache control headers to prevent caching - ensure real-time updates
-    response['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0'
-    response['Pragma'] = 'no-cache'
-    response['Expires'] = '0'
-    response['X-Accel-Expires'] = '0'
+    else:
+        # Rendering runs context processors that touch the ORM, so it stays sync
+        response = await sync_to_async(render)(request, 'finance_app/ai_tips.html', context)
+    # Personal data: never store in shared caches, and always check back with
+    # the server (which answers from the tips cache when nothing changed)
+    response['Cache-Control'] = 'private, no-cache'
     return response
 
 
-def fetch_financial_news():
-    """Fetch financial news from NewsAPI"""
-    news_api_key = os.getenv('NEWS_API_KEY', '')
-    news_articles = []
-    
-    if not news_api_key or not HAS_REQUESTS:
-        return news_articles
-    
-    try:
-        # NewsAPI endpoint for financial news
-        url = 'https://newsapi.org/v2/everything'
-        params = {
-            'q': 'finance OR financial OR economy OR stock market OR investing OR cryptocurrency',
-            'language': 'en',
-            'sortBy': 'publishedAt',
-            'pageSize': 10,
-            'apiKey': news_api_key
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('status') == 'ok':
-                for item in data.get('articles', [])[:10]:
-                    # Check if news article already exists in database
-                    existing = Article.objects.filter(
-                        article_type='news',
-                        title=item.get('title', '')[:300],
-                        source=item.get('url', '')[:200]
-                    ).first()
-                    
-                    if not existing and item.get('title') and item.get('description'):
-                        # Create news article in database
-                        content_text = item.get('content', '') or item.get('description', '')
-                        # Truncate content if too long (Article.content is TextField, but we'll limit for consistency)
-                        if len(content_text) > 10000:
-                            content_text = content_text[:10000] + '...'
-                        
-                        news_article = Article.objects.create(
-                            article_type='news',
-                            title=item.get('title', '')[:300],
-                            summary=item.get('description', '')[:500] if item.get('description') else '',
-                            content=content_text,
-                            author=item.get('author', '')[:200] if item.get('author') else 'News Source',
-                            source=item.get('url', '')[:200] if item.get('url') else '',
-                            image_url=item.get('urlToImage', '')[:500] if item.get('urlToImage') else '',
-                            category='News',
-                        )
-                        news_articles.append(news_article)
-                    elif existing:
-                        news_articles.append(existing)
-    except Exception as e:
-        print(f"Error fetching news: {e}")
-    
-    return news_articles
+@login_required
+async def ai_tips_stream_view(request):
+    """Stream AI tips as server-sent events while they are being generated"""
+    request.user = user = await request.auser()
+    spending_summary, currency_symbol = await aspending_summary(user)
+    regenerate = request.GET.get('regenerate') == '1'
+    
+    async def events():
+        async for event, data in astream_savings_tips(
+            user.id, spending_summary, currency_symbol, regenerate=regenerate
+        ):
+            yield f'event: {event}\ndata: {json.dumps(data)}\n\n'
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@staff_member_required
+def outbound_status_view(request):
+    """Circuit breaker state and call counters for external APIs (this process only)"""
+    response = JsonResponse({'services': outbound_metrics()})
+    response['Cache-Control'] = 'no-store'
+    return response
 
 
 @login_required
@@ -719,34 +562,16 @@ def articles_view(request):
     show_type = request.GET.get('type', 'all')  # all, article, news
     
     # Get user articles (not news)
-    articles = Article.objects.filter(article_type='article')
-    
-    # Get news articles (don't slice yet - apply filters first)
-    news_articles = Article.objects.filter(article_type='news').order_by('-created_at')
+    articles = Article.objects.filter(article_type='article').select_related('user')
     
-    # If no news in database, try to fetch
-    if not news_articles.exists():
-        fetched_news = fetch_financial_news()
-        if fetched_news:
-            # Re-fetch after adding news
-            news_articles = Article.objects.filter(article_type='news').order_by('-created_at')
+    # Get news articles (don't slice yet - apply filters first). News is
+    # fetched out of band by the ingest_news command
+    news_articles = Article.objects.filter(article_type='news').order_by('-published_at', '-created_at')
     
     # Apply filters to articles
     if category_filter:
         articles = articles.filter(category__icontains=category_filter)
     
-    if search_query:
-        articles = articles.filter(
-            Q(title__icontains=search_query) | 
-            Q(content__icontains=search_query) |
-            Q(summary__icontains=search_query)
-        )
-        news_articles = news_articles.filter(
-            Q(title__icontains=search_query) | 
-            Q(content__icontains=search_query) |
-            Q(summary__icontains=search_query)
-        )
-    
     # Filter by type
     if show_type == 'article':
         news_articles = Article.objects.none()
@@ -757,12 +582,19 @@ def articles_view(request):
     categories = Article.objects.filter(article_type='article').values_list('category', flat=True).distinct()
     categories = [cat for cat in categories if cat]
     
-    # Featured articles first (only user articles, not news)
-    featured = articles.filter(is_featured=True)[:3]
-    other_articles = articles.exclude(id__in=[a.id for a in featured])
-    
-    # Slice news articles after all filters are applied (limit to 10)
-    news_articles = news_articles[:10]
+    if search_query:
+        # Ranked full-text matches; featured ones are still pulled to the top
+        articles = search_articles(articles, search_query)
+        featured = [a for a in articles if a.is_featured][:3]
+        other_articles = [a for a in articles if a not in featured]
+        news_articles = search_articles(news_articles, search_query, limit=10)
+    else:
+        # Featured articles first (only user articles, not news)
+        featured = articles.filter(is_featured=True)[:3]
+        other_articles = articles.exclude(id__in=[a.id for a in featured])
+        
+        # Slice news articles after all filters are applied (limit to 10)
+        news_articles = news_articles[:10]
     
     context = {
         'featured_articles': featured,
@@ -801,7 +633,8 @@ def article_create_view(request):
 def article_detail_view(request, pk):
     """Article detail view"""
     article = get_object_or_404(Article, pk=pk)
-    article.increment_view_count()
+    record_article_view(article.pk)
+    article.view_count = live_view_count(article)
     
     # Get related articles (same type and category)
     related_articles = Article.objects.filter(
@@ -821,12 +654,19 @@ def goals_view(request):
     """Goal tracker - list all goals"""
     goals = Goal.objects.filter(user=request.user).order_by('-created_at')
     
-    # Calculate stats
-    total_goals = goals.count()
-    active_goals = goals.filter(status='active').count()
-    completed_goals = goals.filter(status='completed').count()
-    total_target = sum([float(g.target_amount) for g in goals])
-    total_saved = sum([float(g.current_amount) for g in goals])
+    # Calculate stats in one aggregate
+    stats = goals.aggregate(
+        total_goals=Count('id'),
+        active_goals=Count('id', filter=Q(status='active')),
+        completed_goals=Count('id', filter=Q(status='completed')),
+        total_target=Sum('target_amount'),
+        total_saved=Sum('current_amount'),
+    )
+    total_goals = stats['total_goals']
+    active_goals = stats['active_goals']
+    completed_goals = stats['completed_goals']
+    total_target = float(stats['total_target'] or 0)
+    total_saved = float(stats['total_saved'] or 0)
     overall_progress = (total_saved / total_target * 100) if total_target > 0 else 0
     
     context = {
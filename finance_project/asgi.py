@@ -15,3 +15,9 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finance_project.settings')
 
 application = get_asgi_application()
 
+# Every async view runs on the server's one long-lived event loop, so
+# outbound HTTP clients can stay open between requests
+from finance_app.outbound import share_async_clients  # noqa: E402
+
+share_async_clients()
+
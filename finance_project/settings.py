@@ -44,11 +44,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files in production
+    'finance_app.middleware.StaticFilesMiddleware',  # WhiteNoise, for static files in production
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'finance_app.middleware.CurrencyMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -99,6 +100,44 @@ except ImportError:
     }
 
 
+# Cache
+# Use Redis when REDIS_URL is set so cached figures are shared across workers;
+# otherwise fall back to a per-process in-memory cache. Per-user data versions
+# live in the database (UserProfile.data_version), so either way no worker
+# serves figures from before another worker's write.
+# Generated AI tips get their own alias with a TTL and an entry cap. LocMemCache
+# evicts least-recently-used entries past MAX_ENTRIES; on Redis, configure
+# maxmemory-policy allkeys-lru (or volatile-lru) for the same effect
+AI_TIPS_CACHE_SECONDS = int(os.environ.get('AI_TIPS_CACHE_SECONDS', 6 * 60 * 60))
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        'tips': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'tips',
+            'TIMEOUT': AI_TIPS_CACHE_SECONDS,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'credgerly',
+        },
+        'tips': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'credgerly-tips',
+            'TIMEOUT': AI_TIPS_CACHE_SECONDS,
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -147,6 +186,12 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Authentication backends (profile is loaded with the user; ModelBackend kept for existing sessions)
+AUTHENTICATION_BACKENDS = [
+    'finance_app.backends.ProfileModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Login URLs
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
@@ -157,6 +202,16 @@ LOGOUT_REDIRECT_URL = 'login'
 # OPENAI_API_KEY: Get your API key from https://platform.openai.com/
 # Set them as environment variables in your deployment platform
 
+# External API endpoints; point them at local stub servers to exercise news
+# ingestion (python manage.py ingest_news) and AI tips without the real APIs
+NEWS_API_URL = os.environ.get('NEWS_API_URL', 'https://newsapi.org/v2/everything')
+OPENAI_API_URL = os.environ.get('OPENAI_API_URL', 'https://api.openai.com/v1/chat/completions')
+
+# Where savings tips come from: 'auto' uses OpenAI when OPENAI_API_KEY is set
+# and the built-in rules engine otherwise; or a dotted path to a TipBackend
+# (finance_app.tips.LocalTipBackend, finance_app.tips.OpenAITipBackend)
+TIPS_BACKEND = os.environ.get('TIPS_BACKEND', 'auto')
+
 # Security settings for production
 if not DEBUG:
     SECURE_SSL_REDIRECT = os.environ.get('SECURE_SSL_REDIRECT', 'False') == 'True'